@@ -1,4 +1,6 @@
 from maze import Maze
+from memory_stats import MemoryStats
+from profiling import SearchStats
 from search import Successor
 
 
@@ -40,6 +42,9 @@ def search_analysis(
     max_frontier_size: int,
     cpu_time: float,
     memory_used: int,
+    bound: float | None = None,
+    stats: SearchStats | None = None,
+    memory: MemoryStats | None = None,
 ) -> None:
     maze = successor.maze
     solution_true_cost = maze.cost
@@ -61,6 +66,14 @@ def search_analysis(
     print(f"Number of search steps: {searches_done}")
     print(f"Maximum number of nodes in the frontier at any time: {max_frontier_size}")
     print(f"Number of nodes in the frontier at the end: {final_frontier_size}")
+    if bound is not None:
+        print(f"Cost is at most {bound:.3f} times the optimum")
+    if stats is not None:
+        print("\nProfile of the search:\n")
+        stats.display_info()
+    if memory is not None:
+        print("\nMemory of the search:\n")
+        memory.display_info()
 
     heuristic_prime = 0
     cost_prime = solution_true_cost
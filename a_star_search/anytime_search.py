@@ -0,0 +1,157 @@
+import heapq
+from copy import deepcopy
+from time import monotonic
+from typing import Callable, Iterator
+
+from maze import Direction, Maze, MazeState
+from search import Successor
+
+
+def ara_star_search(
+    maze: Maze,
+    heuristic_function: Callable[[MazeState], int],
+    verbose: bool = False,
+    initial_weight: float = 3.0,
+    weight_step: float = 0.5,
+    time_limit: float | None = None,
+    max_expansions: int | None = None,
+) -> Iterator[tuple[Successor, int, int, int, float]]:
+    """
+    Anytime repairing A* (ARA*) over compact states.
+
+    The first pass runs weighted A* with f = g + weight * h, which finds a
+    solution quickly. Each later pass lowers the weight by `weight_step` down
+    to 1 and resumes from the previous open list plus the states that improved
+    after being closed, so earlier effort is reused instead of repeated.
+
+    Yields (successor, searches_done, max_frontier_size, final_frontier_size,
+    bound) whenever the solution or its bound improves. `bound` is the factor by
+    which the solution cost can exceed the optimum, which only holds for an
+    admissible heuristic. Stops once the wall-clock `time_limit` (seconds) or
+    `max_expansions` is spent, or after the pass with weight 1. Raises
+    ValueError if that happens before any solution is found.
+    """
+    deadline = None if time_limit is None else monotonic() + time_limit
+    start = MazeState.from_maze(maze)
+    states: dict[MazeState, MazeState] = {start: start}  # Cheapest copy of a state
+    parents: dict[MazeState, tuple[MazeState, Direction] | None] = {start: None}
+    h_values: dict[MazeState, int] = {start: heuristic_function(start)}
+    opened: set[MazeState] = {start}
+    closed: set[MazeState] = set()
+    inconsistent: set[MazeState] = set()  # Improved after they were closed
+    heap: list = []
+    counter = 0
+    searches_done = 0
+    max_frontier_size = 1
+    incumbent: MazeState | None = start if start.goal_reached else None
+    weight = initial_weight
+
+    def push(state: MazeState) -> None:
+        nonlocal counter
+        f = state.cost + weight * h_values[state]
+        heapq.heappush(heap, (f, -state.cost, counter, state.cost, state))
+        counter += 1
+
+    def out_of_budget() -> bool:
+        return (max_expansions is not None and searches_done >= max_expansions) or (
+            deadline is not None and monotonic() >= deadline
+        )
+
+    def improve_path() -> bool:
+        """Expand until no open state can beat the incumbent; False if out of budget."""
+        nonlocal searches_done, max_frontier_size, incumbent
+        while heap:
+            f, _, _, g, state = heap[0]
+            if state not in opened or states[state].cost != g:
+                heapq.heappop(heap)  # Stale entry
+                continue
+            if incumbent is not None and f >= incumbent.cost:
+                return True
+            if out_of_budget():
+                return False
+            heapq.heappop(heap)
+            state = states[state]
+            opened.discard(state)
+            closed.add(state)
+            searches_done += 1
+
+            for direction in Direction:
+                child = state.take_action(direction)
+                if child is None:
+                    continue
+                known = states.get(child)
+                if known is not None and known.cost <= child.cost:
+                    continue
+                states[child] = child
+                parents[child] = (state, direction)
+                if child.goal_reached:
+                    if incumbent is None or child.cost < incumbent.cost:
+                        incumbent = child
+                    continue
+                h_values[child] = heuristic_function(child)
+                if child in closed:
+                    inconsistent.add(child)
+                else:
+                    opened.add(child)
+                    push(child)
+            max_frontier_size = max(max_frontier_size, len(opened))
+        return True
+
+    def solution() -> Successor:
+        directions = []
+        state = incumbent
+        while parents[state] is not None:
+            state, direction = parents[state]
+            directions.append(direction)
+        solved_maze = deepcopy(maze)
+        for direction in reversed(directions):
+            solved_maze.take_action(direction)
+        return Successor(solved_maze, None, heuristic_function)
+
+    def bound(finished_pass: bool) -> float:
+        pending = opened | inconsistent
+        if not pending or incumbent.cost == 0:
+            return 1.0
+        lower = min(states[state].cost + h_values[state] for state in pending)
+        ratio = incumbent.cost / lower
+        return max(1.0, min(weight, ratio) if finished_pass else ratio)
+
+    push(start)
+    published = (float("inf"), float("inf"))  # (cost, bound) of the last yield
+    while True:
+        if verbose:
+            print(f"Searching with heuristic weight {weight:.2f}")
+        finished_pass = improve_path()
+        if incumbent is not None:
+            current = (incumbent.cost, bound(finished_pass))
+            if current < published:
+                published = current
+                if verbose:
+                    print(
+                        f"Solution with cost {current[0]}, "
+                        f"at most {current[1]:.3f} times the optimum"
+                    )
+                yield (
+                    solution(),
+                    searches_done,
+                    max_frontier_size,
+                    len(opened),
+                    current[1],
+                )
+        elif not heap and not inconsistent:
+            raise ValueError("Goal state not reached")
+        if not finished_pass or weight == 1:
+            if incumbent is None:
+                raise ValueError(
+                    "Goal state not reached"
+                    + ("" if finished_pass else " within the time and expansion budget")
+                )
+            return
+
+        weight = max(1.0, weight - weight_step)
+        opened |= inconsistent
+        inconsistent.clear()
+        closed.clear()
+        heap.clear()
+        for state in opened:
+            push(states[state])
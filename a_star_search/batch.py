@@ -0,0 +1,217 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import resource
+import sys
+from contextlib import nullcontext
+from time import monotonic, process_time, sleep
+
+from heuristic import HEURISTICS
+from macro_search import macro_a_star_search
+from maze import Maze
+from search import a_star_search, in_place_a_star_search
+
+SEARCHES = {
+    "full": lambda maze, heuristic_function: a_star_search(maze, heuristic_function),
+    "compact": lambda maze, heuristic_function: a_star_search(
+        maze, heuristic_function, compact=True
+    ),
+    "in-place": in_place_a_star_search,
+    "macro": macro_a_star_search,
+}
+FIELDS = [
+    "level",
+    "heuristic",
+    "search",
+    "status",
+    "cost",
+    "actions",
+    "searches_done",
+    "max_frontier_size",
+    "final_frontier_size",
+    "cpu_time",
+    "wall_time",
+    "peak_memory_mb",
+    "error",
+]
+
+
+def parse_levels(spec: str) -> list[int]:
+    """Parse level lists such as "1-5,7,11-15"."""
+    levels = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        levels.extend(range(int(first), int(last or first) + 1))
+    for level in levels:
+        if level < 1 or level > 15:
+            raise ValueError("Maze level should be between 1 and 15.")
+    return levels
+
+
+def parse_heuristics(spec: str) -> list[str]:
+    names = list(HEURISTICS) if spec == "all" else spec.split(",")
+    for name in names:
+        if name not in HEURISTICS:
+            raise ValueError(
+                f"Unknown heuristic '{name}', expected one of: {', '.join(HEURISTICS)}."
+            )
+    return names
+
+
+def solve(
+    level: int | str, heuristic: str, search: str, memory_limit: int | None, pipe
+):
+    """Run one search in a worker process and send its record through `pipe`."""
+    record = {"level": level, "heuristic": heuristic, "search": search}
+    if memory_limit is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    start_cpu = process_time()
+    result = None
+    try:
+        result = SEARCHES[search](Maze(level), HEURISTICS[heuristic])
+        record["status"] = "solved"
+    except MemoryError:
+        record["status"] = "memory"  # Allocate nothing while the search is held
+    except Exception as error:
+        record.update(status="error", error=repr(error))
+    if result is not None:
+        successor, searches_done, max_frontier_size, final_frontier_size = result
+        maze = successor.maze
+        record.update(
+            cost=maze.cost,
+            actions=" ".join(str(action) for action in maze.actions),
+            searches_done=searches_done,
+            max_frontier_size=max_frontier_size,
+            final_frontier_size=final_frontier_size,
+        )
+    record["cpu_time"] = round(process_time() - start_cpu, 3)
+    record["peak_memory_mb"] = round(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 3
+    )  # Linux reports kilobytes
+    pipe.send(record)
+
+
+def run_batch(
+    jobs: list[tuple[int | str, str, str]],
+    workers: int,
+    timeout: float | None = None,
+    memory_limit: int | None = None,
+):
+    """
+    Solve every (level, heuristic, search) job, `workers` at a time.
+
+    Each job gets its own process, so a job that runs past `timeout` seconds is
+    killed and one that goes over `memory_limit` megabytes of address space fails
+    alone. Records are yielded in completion order.
+    """
+    context = multiprocessing.get_context()
+    pending = list(reversed(jobs))
+    running = []  # (job, process, receiving pipe, start time)
+    while pending or running:
+        while pending and len(running) < workers:
+            job = pending.pop()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=solve, args=(*job, memory_limit, sender), daemon=True
+            )
+            process.start()
+            sender.close()
+            running.append((job, process, receiver, monotonic()))
+
+        still_running = []
+        for job, process, receiver, started in running:
+            wall_time = round(monotonic() - started, 3)
+            record = None
+            if receiver.poll():
+                try:
+                    record = receiver.recv()
+                except EOFError:  # The process died without sending a record
+                    process.join()
+                    record = {
+                        "status": "crashed",
+                        "error": f"exit code {process.exitcode}",
+                    }
+            elif timeout is not None and wall_time > timeout:
+                process.kill()
+                record = {"status": "timeout"}
+            if record is None:
+                still_running.append((job, process, receiver, started))
+                continue
+            process.join()
+            receiver.close()
+            level, heuristic, search = job
+            record.update(
+                level=level, heuristic=heuristic, search=search, wall_time=wall_time
+            )
+            yield {field: record.get(field) for field in FIELDS}
+        running = still_running
+        sleep(0.01)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Solve many color maze levels with many heuristics in parallel."
+    )
+    parser.add_argument(
+        "-l", "--levels", default="1-15", help='Levels to solve, e.g. "1-5,7,11-15"'
+    )
+    parser.add_argument(
+        "-H",
+        "--heuristics",
+        default="all",
+        help=f"Comma separated heuristics, or all of: {', '.join(HEURISTICS)}",
+    )
+    parser.add_argument(
+        "-s",
+        "--search",
+        choices=SEARCHES,
+        default="compact",
+        help="Search variant to run every job with",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help="Number of jobs to run at once",
+    )
+    parser.add_argument(
+        "-t", "--timeout", type=float, help="Wall-clock limit per job in seconds"
+    )
+    parser.add_argument(
+        "-m", "--memory-limit", type=int, help="Address space limit per job in MB"
+    )
+    parser.add_argument(
+        "-o", "--output", help="File to write records to, stdout if not given"
+    )
+    parser.add_argument(
+        "-F",
+        "--format",
+        choices=["jsonl", "csv"],
+        default="jsonl",
+        help="One JSON object per line, or CSV with a header row",
+    )
+    args = parser.parse_args()
+
+    jobs = [
+        (level, heuristic, args.search)
+        for level in parse_levels(args.levels)
+        for heuristic in parse_heuristics(args.heuristics)
+    ]
+    with (
+        open(args.output, "w", newline="")
+        if args.output
+        else nullcontext(sys.stdout)  # Leave stdout open for the caller
+    ) as output:
+        writer = None
+        if args.format == "csv":
+            writer = csv.DictWriter(output, fieldnames=FIELDS)
+            writer.writeheader()
+        for record in run_batch(jobs, args.jobs, args.timeout, args.memory_limit):
+            if writer:
+                writer.writerow(record)
+            else:
+                output.write(json.dumps(record) + "\n")
+            output.flush()
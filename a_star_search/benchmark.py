@@ -0,0 +1,257 @@
+import argparse
+import heapq
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from datetime import date
+from pathlib import Path
+from statistics import median
+from time import process_time
+
+from batch import SEARCHES
+from heuristic import HEURISTICS
+from maze import Maze
+
+BASELINE_PATH = Path("benchmarks") / "baseline.json"
+BASELINE_VERSION = 2  # Bump when the record layout changes
+LEVELS = [1, 3, 7, 10, 11, 14, 15]
+BENCHMARK_HEURISTICS = ["inadmissible", "monotonic", "nearest_uncolored"]
+# The search is deterministic, so any growth of these is a regression
+COUNTED_METRICS = ["searches_done", "max_frontier_size", "final_frontier_size"]
+MEMORY_NOISE_FLOOR = 0.1  # Absolute slack in MB for allocator noise
+TIME_NOISE_FLOOR = 0.01  # Absolute slack in seconds for timer noise
+
+
+def calibrate(repeats: int = 5) -> float:
+    """
+    Fastest CPU time of a fixed pure Python workload on this machine.
+
+    The workload does what the search spends its time on, dictionary and heap
+    operations, so search times divided by it can be compared across machines.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start_cpu = process_time()
+        seen: dict[int, int] = {}
+        heap: list[tuple[int, int]] = []
+        for i in range(200_000):
+            key = i * 7919 % 100_003
+            seen[key] = seen.get(key, 0) + 1
+            heapq.heappush(heap, (key, i))
+        while heap:
+            heapq.heappop(heap)
+        best = min(best, process_time() - start_cpu)
+    return round(best, 4)
+
+
+def benchmark_case(
+    level: int, heuristic: str, search: str, warmup: int, repeats: int
+) -> dict:
+    """Time one level and heuristic pair, then measure its peak memory once."""
+    search_function = SEARCHES[search]
+    heuristic_function = HEURISTICS[heuristic]
+    times = []
+    for run in range(warmup + repeats):
+        maze = Maze(level)
+        start_cpu = process_time()
+        successor, searches_done, max_frontier_size, final_frontier_size = (
+            search_function(maze, heuristic_function)
+        )
+        if run >= warmup:
+            times.append(process_time() - start_cpu)
+
+    # Tracing slows the search down, so memory gets a run of its own
+    tracemalloc.start()
+    search_function(Maze(level), heuristic_function)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median_cpu_time = median(times)
+    return {
+        "cost": successor.maze.cost,
+        "searches_done": searches_done,
+        "max_frontier_size": max_frontier_size,
+        "final_frontier_size": final_frontier_size,
+        "median_cpu_time": round(median_cpu_time, 4),
+        "min_cpu_time": round(min(times), 4),
+        "expansions_per_second": round(searches_done / max(median_cpu_time, 1e-9)),
+        "peak_memory_mb": round(peak / 1024 / 1024, 3),
+    }
+
+
+def run_benchmarks(
+    levels: list[int],
+    heuristics: list[str],
+    search: str,
+    warmup: int = 1,
+    repeats: int = 5,
+    verbose: bool = False,
+) -> dict:
+    """Run the level by heuristic matrix and return a baseline document."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    calibration = calibrate()
+    results = {}
+    for level in levels:
+        for heuristic in heuristics:
+            key = f"lvl{level}/{heuristic}"
+            results[key] = benchmark_case(level, heuristic, search, warmup, repeats)
+            if verbose:
+                print(key, json.dumps(results[key]), file=sys.stderr)
+    return {
+        "version": BASELINE_VERSION,
+        "commit": commit,
+        "date": date.today().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "search": search,
+        "warmup": warmup,
+        "repeats": repeats,
+        "calibration_cpu_time": calibration,
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float
+) -> tuple[list[str], list[str]]:
+    """
+    List every regression of `current` against `baseline`, then every warning.
+
+    A changed solution cost and any growth of the expansion and frontier
+    counts are regressions, as is peak memory growing by more than
+    `threshold` (a fraction) plus a small absolute slack. CPU times depend on
+    the machine, so they are divided by the calibration time of the run that
+    took them, and growing by more than `threshold` is only a warning.
+    """
+    if baseline["version"] != current["version"]:
+        message = (
+            f"Baseline format {baseline['version']} does not match "
+            f"{current['version']}, save a new baseline."
+        )
+        return [message], []
+    if baseline["search"] != current["search"]:
+        return [f"Baseline was taken with the {baseline['search']} search."], []
+    speed = current["calibration_cpu_time"] / baseline["calibration_cpu_time"]
+    regressions = []
+    warnings = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        reference = baseline["results"][key]
+        if result["cost"] != reference["cost"]:
+            regressions.append(
+                f"{key}: cost changed from {reference['cost']} to {result['cost']}"
+            )
+        for metric in COUNTED_METRICS:
+            if result[metric] > reference[metric]:
+                regressions.append(
+                    f"{key}: {metric} went from {reference[metric]} to {result[metric]}"
+                )
+        limit = reference["peak_memory_mb"] * (1 + threshold) + MEMORY_NOISE_FLOOR
+        if result["peak_memory_mb"] > limit:
+            regressions.append(
+                f"{key}: peak_memory_mb went from {reference['peak_memory_mb']} "
+                f"to {result['peak_memory_mb']}"
+            )
+        # The baseline time as it would have been measured on this machine
+        expected = reference["min_cpu_time"] * speed
+        if result["min_cpu_time"] > expected * (1 + threshold) + TIME_NOISE_FLOOR:
+            warnings.append(
+                f"{key}: min_cpu_time went from {expected:.4f} (calibrated) "
+                f"to {result['min_cpu_time']}"
+            )
+    return regressions, warnings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the A* search and check it against a saved baseline."
+    )
+    parser.add_argument(
+        "-l",
+        "--levels",
+        type=int,
+        nargs="+",
+        default=LEVELS,
+        help="Levels in the benchmark matrix",
+    )
+    parser.add_argument(
+        "-H",
+        "--heuristics",
+        nargs="+",
+        choices=HEURISTICS,
+        default=BENCHMARK_HEURISTICS,
+        help="Heuristics in the benchmark matrix",
+    )
+    parser.add_argument(
+        "-s",
+        "--search",
+        choices=SEARCHES,
+        default="compact",
+        help="Search variant to benchmark",
+    )
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per case")
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        type=Path,
+        default=BASELINE_PATH,
+        help="Baseline file to compare against or save to",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed growth of peak memory and CPU time, as a fraction",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Store the results as the new baseline instead of comparing",
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Also write results here")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Print each case as it finishes"
+    )
+    args = parser.parse_args()
+
+    current = run_benchmarks(
+        args.levels,
+        args.heuristics,
+        args.search,
+        args.warmup,
+        args.repeats,
+        args.verbose,
+    )
+    document = json.dumps(current, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(document, encoding="utf-8")
+    if args.save:
+        args.baseline.write_text(document, encoding="utf-8")
+        print(f"Saved {len(current['results'])} results to {args.baseline}")
+        sys.exit(0)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions, warnings = compare(baseline, current, args.threshold)
+    for warning in warnings:
+        print(f"\033[93mWARNING\033[0m {warning}")
+    for regression in regressions:
+        print(f"\033[91mREGRESSION\033[0m {regression}")
+    if regressions:
+        sys.exit(1)
+    print(
+        f"\033[92mOK\033[0m {len(current['results'])} cases within "
+        f"{args.threshold:.0%} of the baseline"
+    )
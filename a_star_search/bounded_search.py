@@ -0,0 +1,254 @@
+import heapq
+from copy import deepcopy
+from typing import Callable
+
+from maze import Direction, Maze, MazeState
+from search import CompactSuccessor, Successor
+
+
+def ida_star_search(
+    maze: Maze,
+    heuristic_function: Callable[[Maze], int],
+    verbose: bool = False,
+    table_size: int = 100_000,
+) -> tuple[Successor, int, int, int]:
+    """
+    Iterative deepening A*: depth-first passes under a rising f threshold.
+
+    Memory is the current path plus a transposition table of at most
+    `table_size` Zobrist keys, which prunes states already reached more cheaply
+    within the same pass. The frontier sizes reported are the deepest and the
+    final depth of the search stack.
+    """
+    working_maze = deepcopy(maze)  # Leave the caller's maze untouched
+    threshold = heuristic_function(working_maze)
+    searches_done = 0
+    max_depth = 1
+    table: dict[int, int] = {}
+
+    if verbose:
+        print("\n---------- START OF THE SEARCH ALGORITHM -------------\n")
+
+    stack = []
+    while not working_maze.goal_reached:
+        if verbose:
+            print("-----------------------------")
+            print("Searching with f threshold", threshold)
+        next_threshold = float("inf")
+        table.clear()
+        table[working_maze.zobrist] = 0
+        stack = [iter(Direction)]  # Directions left to try at every depth
+        while stack:
+            direction = next(stack[-1], None)
+            if direction is None:
+                stack.pop()
+                if stack:
+                    working_maze.undo_action()
+                continue
+            if not working_maze.take_action(direction):
+                continue
+
+            g = working_maze.cost
+            f = g + heuristic_function(working_maze)
+            if f > threshold:
+                next_threshold = min(next_threshold, f)
+                working_maze.undo_action()
+                continue
+            if working_maze.goal_reached:
+                break
+            key = working_maze.zobrist
+            if key in table and table[key] <= g:
+                working_maze.undo_action()
+                continue
+            if key in table or len(table) < table_size:
+                table[key] = g
+
+            searches_done += 1
+            stack.append(iter(Direction))
+            max_depth = max(max_depth, len(stack))
+            if verbose:
+                print("-----------------------------")
+                print("Searched node", searches_done)
+                print("Estimated cost of finishing maze through this node:", f)
+                working_maze.display_info()
+
+        if not stack and next_threshold == float("inf"):
+            raise ValueError("Goal state not reached")
+        threshold = next_threshold
+
+    if verbose:
+        print("---------- END OF THE SEARCH ALGORITHM -------------")
+    return (
+        Successor(working_maze, None, heuristic_function),
+        searches_done,
+        max_depth,
+        len(stack),
+    )
+
+
+class BoundedSuccessor(CompactSuccessor):
+    """CompactSuccessor that also tracks what SMA* needs to forget and regrow it."""
+
+    __slots__ = ("f", "depth", "children", "forgotten", "version", "in_open")
+
+    def __init__(
+        self,
+        state: MazeState,
+        parent: "BoundedSuccessor | None",
+        direction: Direction | None,
+        heuristic_function: Callable[[MazeState], int],
+        source: Maze | None = None,
+    ):
+        super().__init__(state, parent, direction, heuristic_function, source)
+        if parent is None:
+            self.f = heuristic_function(state)
+            self.depth = 0
+        else:
+            self.f = max(parent.f, self.cost)  # Pathmax keeps f from decreasing
+            self.depth = parent.depth + 1
+        self.children: list[BoundedSuccessor] = []
+        self.forgotten = float("inf")  # Lowest f among evicted children
+        self.version = 0  # Bumped on every push so older heap entries go stale
+        self.in_open = False
+
+
+def sma_star_search(
+    maze: Maze,
+    heuristic_function: Callable[[MazeState], int],
+    verbose: bool = False,
+    max_nodes: int = 100_000,
+) -> tuple[BoundedSuccessor, int, int, int]:
+    """
+    Simplified memory-bounded A* (SMA*) over compact states.
+
+    At most `max_nodes` search nodes are kept. When the budget is exceeded the
+    shallowest leaf with the highest f is evicted and its f is remembered by the
+    parent. A parent with forgotten children stays open under the lowest
+    forgotten f, so they are grown again once that f is the best on offer. The
+    frontier sizes reported are the peak and final number of nodes in memory.
+    """
+    root = BoundedSuccessor.root(maze, heuristic_function)
+    best: list = []  # Min-heap of open nodes by f, deepest first
+    worst: list = []  # Max-heap of open nodes by f, shallowest first
+    in_memory: dict[MazeState, BoundedSuccessor] = {root.state: root}
+    counter = 0
+    used = 1
+    max_used = 1
+    searches_done = 0
+
+    def push(node: BoundedSuccessor, f: int) -> None:
+        nonlocal counter
+        node.version += 1
+        node.in_open = True
+        heapq.heappush(best, (f, -node.depth, counter, node.version, node))
+        heapq.heappush(worst, (-f, node.depth, counter, node.version, node))
+        counter += 1
+
+    def pop_best() -> BoundedSuccessor | None:
+        while best:
+            *_, version, node = heapq.heappop(best)
+            if node.in_open and node.version == version:
+                node.in_open = False
+                return node
+        return None
+
+    def pop_worst_leaf() -> BoundedSuccessor | None:
+        while worst:
+            *_, version, node = heapq.heappop(worst)
+            if node.in_open and node.version == version and not node.children:
+                node.in_open = False
+                return node
+        return None
+
+    def backup(node: BoundedSuccessor) -> None:
+        while node is not None and node.children:
+            f = min(min(child.f for child in node.children), node.forgotten)
+            if f == node.f:
+                break
+            node.f = f
+            node = node.parent
+
+    def forget(node: BoundedSuccessor) -> None:
+        nonlocal used
+        parent = node.parent
+        parent.children.remove(node)
+        parent.forgotten = min(parent.forgotten, node.f)
+        if in_memory.get(node.state) is node:
+            del in_memory[node.state]
+        node.in_open = False
+        used -= 1
+        if parent.children:
+            backup(parent)
+        else:
+            parent.f = parent.forgotten
+        if parent.forgotten < float("inf"):
+            push(parent, parent.forgotten)  # Open until the children are regrown
+
+    push(root, root.f)
+    if verbose:
+        print("\n---------- START OF THE SEARCH ALGORITHM -------------\n")
+
+    while True:
+        node = pop_best()
+        if node is None:
+            raise ValueError("Goal state not reached")
+
+        if verbose:
+            print("-----------------------------")
+            print("Searched node", searches_done)
+            print("Estimated cost of finishing maze through this node:", node.f)
+            print("Nodes in memory:", used)
+            node.state.display_info()
+
+        if node.state.goal_reached:
+            if verbose:
+                print("---------- END OF THE SEARCH ALGORITHM -------------")
+            return node, searches_done, max_used, used
+
+        searches_done += 1
+        node.forgotten = float("inf")  # Every missing child is generated again
+        grown = {child.direction for child in node.children}
+        for direction in Direction:
+            if direction in grown:
+                continue
+            state = node.state.take_action(direction)
+            if state is None:
+                continue
+            existing = in_memory.get(state)
+            if existing is not None and existing.state.cost <= state.cost:
+                continue  # Already held in memory at least as cheaply
+            child = BoundedSuccessor(state, node, direction, heuristic_function)
+            in_memory[state] = child
+            node.children.append(child)
+            push(child, child.f)
+            used += 1
+
+        if node.children:
+            backup(node)
+        elif node is not root:
+            node.f = float("inf")  # Dead end, nothing below it is worth keeping
+            forget(node)
+
+        while used > max_nodes:
+            victim = pop_worst_leaf()
+            if victim is None:
+                break
+            if victim is root:
+                push(root, root.f)  # The root is never evicted
+                break
+            forget(victim)
+        max_used = max(max_used, used)
+
+        if len(best) > 2 * used:  # Drop stale heap entries and the nodes they hold
+            best[:] = [
+                entry
+                for entry in best
+                if entry[-1].in_open and entry[-1].version == entry[-2]
+            ]
+            worst[:] = [
+                entry
+                for entry in worst
+                if entry[-1].in_open and entry[-1].version == entry[-2]
+            ]
+            heapq.heapify(best)
+            heapq.heapify(worst)
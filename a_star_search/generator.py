@@ -0,0 +1,144 @@
+import argparse
+from pathlib import Path
+from random import Random
+
+from maze import Direction, Layout
+
+
+def strongly_connected_cover(layout: Layout, start: int) -> int:
+    """
+    Bitset of the cells a tour from `start` is certain to be able to color.
+
+    These are the cells crossed by slides that start and land on cells from
+    which the agent can get back to `start`. Any such slide can be taken and
+    left again, so one walk can take all of them.
+    """
+    forward = {start}
+    stack = [start]
+    edges: dict[int, list[int]] = {}
+    while stack:
+        cell = stack.pop()
+        edges[cell] = []
+        for direction in Direction:
+            slide = layout.slides[direction][cell]
+            if slide is None:
+                continue
+            edges[cell].append(slide.landing)
+            if slide.landing not in forward:
+                forward.add(slide.landing)
+                stack.append(slide.landing)
+
+    reverse: dict[int, list[int]] = {cell: [] for cell in forward}
+    for cell, landings in edges.items():
+        for landing in landings:
+            reverse[landing].append(cell)
+    component = {start}
+    stack = [start]
+    while stack:
+        for cell in reverse[stack.pop()]:
+            if cell not in component:
+                component.add(cell)
+                stack.append(cell)
+
+    cover = 1 << start
+    for cell in component:
+        for direction in Direction:
+            slide = layout.slides[direction][cell]
+            if slide is not None and slide.landing in component:
+                cover |= slide.mask
+    return cover
+
+
+def generate_maze(
+    rows: int,
+    cols: int,
+    wall_density: float = 0.25,
+    seed: int | None = None,
+    start_candidates: int = 16,
+    max_attempts: int = 1000,
+) -> list[list[str]]:
+    """
+    Generate a solvable color maze as a grid of "S", "0" and "X" symbols.
+
+    Inner cells become walls with probability `wall_density` and the border is
+    all walls. The start is the one of `start_candidates` random open cells
+    with the largest strongly connected cover. Open cells outside the cover
+    are then walled off, and since that shortens some slides it is repeated
+    until nothing changes. What is left is solvable by construction. Grids
+    with fewer than two open cells are drawn again, up to `max_attempts` times.
+    """
+    if rows < 4 or cols < 4:
+        raise ValueError("A maze needs at least 4 rows and 4 columns.")
+    if not 0 <= wall_density < 1:
+        raise ValueError("The wall density should be at least 0 and below 1.")
+    rng = Random(seed)
+    for _ in range(max_attempts):
+        grid = [
+            [
+                "X"
+                if x in (0, rows - 1)
+                or y in (0, cols - 1)
+                or rng.random() < wall_density
+                else "0"
+                for y in range(cols)
+            ]
+            for x in range(rows)
+        ]
+        open_cells = [
+            (x, y) for x in range(rows) for y in range(cols) if grid[x][y] == "0"
+        ]
+        if not open_cells:
+            continue
+        layout = Layout(grid)
+        start = max(
+            rng.sample(open_cells, min(start_candidates, len(open_cells))),
+            key=lambda cell: strongly_connected_cover(
+                layout, layout.index(cell)
+            ).bit_count(),
+        )
+
+        while True:
+            cover = strongly_connected_cover(layout, layout.index(start))
+            walled = layout.open_mask & ~cover
+            if not walled:
+                break
+            while walled:
+                low = walled & -walled
+                x, y = layout.position(low.bit_length() - 1)
+                grid[x][y] = "X"
+                walled ^= low
+            layout = Layout(grid)
+
+        if layout.open_cells > 1:  # A lone start cell is not much of a maze
+            grid[start[0]][start[1]] = "S"
+            return grid
+    raise ValueError(
+        f"No maze with more than one open cell in {max_attempts} attempts, "
+        "try a lower wall density."
+    )
+
+
+def write_maze(grid: list[list[str]], path: str | Path) -> None:
+    """Write a grid in the format of the files in `mazes/`."""
+    with Path(path).open("w", encoding="utf-8") as file:
+        file.write("\n".join(" ".join(row) for row in grid) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a solvable color maze.")
+    parser.add_argument("rows", type=int, help="Rows, including the border walls")
+    parser.add_argument("cols", type=int, help="Columns, including the border walls")
+    parser.add_argument(
+        "-d", "--density", type=float, default=0.25, help="Share of inner walls"
+    )
+    parser.add_argument("-s", "--seed", type=int, help="Seed for the random walls")
+    parser.add_argument(
+        "-o", "--output", help="Maze file to write, stdout if not given"
+    )
+    args = parser.parse_args()
+
+    grid = generate_maze(args.rows, args.cols, args.density, args.seed)
+    if args.output:
+        write_maze(grid, args.output)
+    else:
+        print("\n".join(" ".join(row) for row in grid))
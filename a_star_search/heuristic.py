@@ -1,4 +1,4 @@
-from maze import Maze
+from maze import Maze, MazeState
 
 
 def inadmissible_heuristic_function(maze: Maze) -> int:
@@ -27,3 +27,27 @@ def heuristic(maze: Maze) -> int:
     # of the actual remaining cost.
     remaining_uncolored_cells = maze.empty_cells
     return nearest_uncolored_distance + remaining_uncolored_cells
+
+
+def nearest_uncolored_heuristic(maze: Maze | MazeState) -> int:
+    # Every remaining uncolored cell costs at least one step, and before the first
+    # of them is reached the agent crosses at least (distance - 1) colored cells.
+    # Walking distances come from rings precomputed per agent cell, so only the
+    # rings up to the nearest uncolored cell are looked at.
+    uncolored = maze.layout.open_mask & ~maze.colored
+    if not uncolored:
+        return 0
+    distance = 1
+    for ring in maze.layout.rings(maze.agent):
+        if ring & uncolored:
+            return maze.empty_cells + distance - 1
+        distance += 1
+    return maze.empty_cells  # Unreachable cells, no better bound available
+
+
+HEURISTICS = {
+    "inadmissible": inadmissible_heuristic_function,
+    "monotonic": monotonic_heuristic_function,
+    "manhattan": heuristic,
+    "nearest_uncolored": nearest_uncolored_heuristic,
+}
@@ -0,0 +1,367 @@
+import argparse
+import heapq
+import json
+import multiprocessing
+import pickle
+from pathlib import Path
+from random import Random
+
+from batch import parse_heuristics
+from heuristic import HEURISTICS
+from maze import Direction, Layout, Maze, MazeState
+from solution_cache import maze_digest
+
+# Read by forked workers, so each layer is shared with them instead of pickled
+_layout: Layout | None = None
+_cost_to_go: dict[int, dict[int, float]] = {}
+_reachable: dict[int, dict[int, int]] = {}
+
+
+def reachable_states(start: MazeState, max_states: int) -> dict[int, dict[int, int]]:
+    """
+    Cheapest cost from `start` to every reachable state, by Dijkstra.
+
+    States are grouped by their colored bitset, then keyed by the agent cell.
+    """
+    layout = start.layout
+    distances = {start.colored: {start.agent: 0}}
+    states = 1
+    queue = [(0, start.colored, start.agent)]
+    while queue:
+        cost, colored, agent = heapq.heappop(queue)
+        if distances[colored][agent] < cost:
+            continue
+        for direction in Direction:
+            slide = layout.slides[direction][agent]
+            if slide is None:
+                continue
+            child_colored = colored | slide.mask
+            child_cost = cost + len(slide.cells)
+            agents = distances.setdefault(child_colored, {})
+            known = agents.get(slide.landing)
+            if known is None:
+                states += 1
+                if states > max_states:
+                    raise MemoryError(
+                        f"More than {max_states} reachable states, raise --max-states."
+                    )
+            elif known <= child_cost:
+                continue
+            agents[slide.landing] = child_cost
+            heapq.heappush(queue, (child_cost, child_colored, slide.landing))
+    return distances
+
+
+def solve_colored_set(colored: int) -> tuple[int, dict[int, float]]:
+    """
+    Exact cost-to-go of every reachable state with `colored` cells colored.
+
+    Moves that color something lead to a larger set, whose costs are already
+    in `_cost_to_go`. The moves that stay within the set are then settled by
+    a backward Dijkstra seeded with those exits.
+    """
+    layout = _layout
+    agents = _reachable[colored]
+    if colored == layout.open_mask:
+        return colored, {agent: 0 for agent in agents}
+    cost_to_go = {agent: float("inf") for agent in agents}
+    predecessors: dict[int, list[tuple[int, int]]] = {agent: [] for agent in agents}
+    for agent in agents:
+        for direction in Direction:
+            slide = layout.slides[direction][agent]
+            if slide is None:
+                continue
+            step = len(slide.cells)
+            if slide.mask & ~colored:
+                exit_cost = step + _cost_to_go[colored | slide.mask][slide.landing]
+                cost_to_go[agent] = min(cost_to_go[agent], exit_cost)
+            else:
+                predecessors[slide.landing].append((agent, step))
+    queue = [(cost, agent) for agent, cost in cost_to_go.items() if cost < float("inf")]
+    heapq.heapify(queue)
+    while queue:
+        cost, agent = heapq.heappop(queue)
+        if cost_to_go[agent] < cost:
+            continue
+        for predecessor, step in predecessors[agent]:
+            if cost + step < cost_to_go[predecessor]:
+                cost_to_go[predecessor] = cost + step
+                heapq.heappush(queue, (cost + step, predecessor))
+    return colored, cost_to_go
+
+
+def exact_cost_to_go(
+    layout: Layout, reachable: dict[int, dict[int, int]], workers: int
+) -> dict[int, dict[int, float]]:
+    """
+    Retrograde search for the exact cost-to-go of every reachable state.
+
+    Colored sets only ever grow, so they are solved from the most colored
+    down, one popcount layer at a time. The sets of a layer only depend on
+    larger layers, so each layer is split over a pool of forked workers.
+    """
+    global _layout, _reachable, _cost_to_go
+    _layout, _reachable, _cost_to_go = layout, reachable, {}
+    layers: dict[int, list[int]] = {}
+    for colored in reachable:
+        layers.setdefault(colored.bit_count(), []).append(colored)
+    context = multiprocessing.get_context("fork")
+    for popcount in sorted(layers, reverse=True):
+        layer = layers[popcount]
+        states = sum(len(reachable[colored]) for colored in layer)
+        if workers > 1 and states > 10000:  # Forking costs more on small layers
+            with context.Pool(workers) as pool:
+                chunksize = max(1, len(layer) // (workers * 4))
+                results = pool.map(solve_colored_set, layer, chunksize=chunksize)
+        else:
+            results = map(solve_colored_set, layer)
+        _cost_to_go.update(results)
+    return _cost_to_go
+
+
+def evaluate_heuristic(job: tuple[str, Layout, list, int]) -> dict:
+    """
+    Compare one heuristic against the exact cost-to-go on a batch of states.
+
+    States come as (colored, agent, cost from start, cost to go). The extra
+    cells traversed are taken from the cheapest path, which only matters to
+    heuristics that look at them.
+    """
+    name, layout, states, optimal_cost = job
+    heuristic_function = HEURISTICS[name]
+    summary = {
+        "states": 0,
+        "ratio_states": 0,  # States other than goals, where h* > 0
+        "ratio_sum": 0.0,
+        "min_ratio": float("inf"),
+        "max_ratio": 0.0,
+        "violations": 0,
+        "max_overshoot": 0,
+        "inconsistent_edges": 0,
+        "edges": 0,
+        "f_below_optimum": 0,
+        "f_at_most_optimum": 0,
+    }
+    for colored, agent, cost, cost_to_go in states:
+        colored_cells = colored.bit_count()
+        state = MazeState(
+            layout, colored, agent, colored_cells, cost - colored_cells + 1
+        )
+        estimate = heuristic_function(state)
+        summary["states"] += 1
+        if cost + estimate < optimal_cost:
+            summary["f_below_optimum"] += 1
+        if cost + estimate <= optimal_cost:
+            summary["f_at_most_optimum"] += 1
+        if cost_to_go > 0:
+            ratio = estimate / cost_to_go
+            summary["ratio_states"] += 1
+            summary["ratio_sum"] += ratio
+            summary["min_ratio"] = min(summary["min_ratio"], ratio)
+            summary["max_ratio"] = max(summary["max_ratio"], ratio)
+        if estimate > cost_to_go:
+            summary["violations"] += 1
+            summary["max_overshoot"] = max(
+                summary["max_overshoot"], estimate - cost_to_go
+            )
+        for direction in Direction:
+            child = state.take_action(direction)
+            if child is None:
+                continue
+            summary["edges"] += 1
+            step = child.cost - state.cost
+            if estimate > step + heuristic_function(child):
+                summary["inconsistent_edges"] += 1
+    return summary
+
+
+def merge_summaries(summaries: list[dict]) -> dict:
+    merged = summaries[0].copy()
+    for summary in summaries[1:]:
+        for field, value in summary.items():
+            if field == "min_ratio":
+                merged[field] = min(merged[field], value)
+            elif field in ("max_ratio", "max_overshoot"):
+                merged[field] = max(merged[field], value)
+            else:
+                merged[field] += value
+    return merged
+
+
+def analyze_heuristics(
+    maze: Maze,
+    heuristics: list[str],
+    workers: int = 1,
+    sample: int | None = None,
+    seed: int = 0,
+    max_states: int = 5_000_000,
+    cache_dir: str | Path | None = None,
+) -> dict:
+    """
+    Measure every heuristic against the exact cost-to-go of `maze`.
+
+    The reachable states and their exact costs are computed once, and kept in
+    `cache_dir` by maze content when one is given. With `sample`, the
+    heuristics are only evaluated on that many random solvable states and
+    the expansion counts are scaled up to the whole state space.
+
+    Expected expansions follow the usual A* argument: with a consistent
+    heuristic every state with f = g* + h below the optimal cost is expanded,
+    and no state with f above it is. For inconsistent or inadmissible
+    heuristics they are only indicative. If no reachable state can color
+    every cell, the report has no heuristics and no evaluated states.
+    """
+    start = MazeState.from_maze(maze)
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = Path(cache_dir) / f"{maze_digest(maze)}.pickle"
+    if cache_path is not None and cache_path.exists():
+        with cache_path.open("rb") as file:
+            reachable, cost_to_go = pickle.load(file)
+    else:
+        reachable = reachable_states(start, max_states)
+        cost_to_go = exact_cost_to_go(start.layout, reachable, workers)
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with cache_path.open("wb") as file:
+                pickle.dump((reachable, cost_to_go), file)
+
+    optimal_cost = cost_to_go[start.colored][start.agent]
+    states = []
+    dead_ends = 0
+    for colored, agents in reachable.items():
+        for agent, cost in agents.items():
+            remaining = cost_to_go[colored][agent]
+            if remaining == float("inf"):
+                dead_ends += 1
+            else:
+                states.append((colored, agent, cost, remaining))
+    solvable = len(states)
+    if not states:  # Not even the start can color every cell
+        return {
+            "optimal_cost": optimal_cost,
+            "reachable_states": dead_ends,
+            "dead_ends": dead_ends,
+            "evaluated_states": 0,
+            "heuristics": {},
+        }
+    if sample is not None and sample < solvable:
+        states = Random(seed).sample(states, sample)
+    scale = solvable / len(states)
+
+    chunk = max(1, len(states) // (workers * 4))
+    batches = [states[i : i + chunk] for i in range(0, len(states), chunk)]
+    jobs = [
+        (name, start.layout, batch, optimal_cost)
+        for name in heuristics
+        for batch in batches
+    ]
+    if workers > 1:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            summaries = pool.map(evaluate_heuristic, jobs)
+    else:
+        summaries = list(map(evaluate_heuristic, jobs))
+
+    results = {}
+    for index, name in enumerate(heuristics):
+        merged = merge_summaries(
+            summaries[index * len(batches) : (index + 1) * len(batches)]
+        )
+        results[name] = {
+            "mean_ratio": merged["ratio_sum"] / max(merged["ratio_states"], 1),
+            "min_ratio": merged["min_ratio"],
+            "max_ratio": merged["max_ratio"],
+            "violations": merged["violations"],
+            "violation_share": merged["violations"] / merged["states"],
+            "max_overshoot": merged["max_overshoot"],
+            "inconsistent_edges": merged["inconsistent_edges"],
+            "inconsistent_share": (
+                merged["inconsistent_edges"] / max(merged["edges"], 1)
+            ),
+            "expected_expansions": round(merged["f_below_optimum"] * scale),
+            "expansions_upper_bound": round(merged["f_at_most_optimum"] * scale),
+        }
+    return {
+        "optimal_cost": optimal_cost,
+        "reachable_states": solvable + dead_ends,
+        "dead_ends": dead_ends,
+        "evaluated_states": len(states),
+        "heuristics": results,
+    }
+
+
+def display_report(report: dict) -> None:
+    print(f"Optimal cost: {report['optimal_cost']}")
+    print(
+        f"Reachable states: {report['reachable_states']}, "
+        f"of which dead ends: {report['dead_ends']}"
+    )
+    if report["dead_ends"] == report["reachable_states"]:
+        print("No reachable state can color every cell, there is nothing to measure.")
+        return
+    print(f"States the heuristics were evaluated on: {report['evaluated_states']}\n")
+    print(
+        f"{'Heuristic':<20}{'mean h/h*':>10}{'min':>7}{'max':>7}"
+        f"{'h > h*':>10}{'overshoot':>11}{'inconsistent':>14}"
+        f"{'f < C*':>10}{'f <= C*':>10}"
+    )
+    for name, result in report["heuristics"].items():
+        print(
+            f"{name:<20}{result['mean_ratio']:>10.3f}{result['min_ratio']:>7.2f}"
+            f"{result['max_ratio']:>7.2f}{result['violation_share']:>10.1%}"
+            f"{result['max_overshoot']:>11}{result['inconsistent_share']:>14.1%}"
+            f"{result['expected_expansions']:>10}{result['expansions_upper_bound']:>10}"
+        )
+    print("\nh > h* is the share of states where the heuristic is not admissible,")
+    print("inconsistent the share of moves where h drops by more than the move costs.")
+    print("f < C* estimates the expansions of A*, f <= C* bounds them with ties.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure heuristics against the exact cost-to-go of a maze."
+    )
+    parser.add_argument("maze", help="Maze level number or maze file")
+    parser.add_argument(
+        "-H",
+        "--heuristics",
+        default="all",
+        help=f"Comma separated heuristics, or all of: {', '.join(HEURISTICS)}",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help="Worker processes for the retrograde search and the evaluation",
+    )
+    parser.add_argument(
+        "-n", "--sample", type=int, help="Evaluate on this many random states only"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --sample")
+    parser.add_argument(
+        "--max-states",
+        type=int,
+        default=5_000_000,
+        help="Give up on mazes with more reachable states than this",
+    )
+    parser.add_argument(
+        "--cache", help="Directory to keep exact costs in, keyed by maze content"
+    )
+    parser.add_argument("-o", "--output", help="File to write the report to as JSON")
+    args = parser.parse_args()
+
+    maze = Maze(int(args.maze) if args.maze.isdigit() else args.maze)
+    report = analyze_heuristics(
+        maze,
+        parse_heuristics(args.heuristics),
+        args.jobs,
+        args.sample,
+        args.seed,
+        args.max_states,
+        args.cache,
+    )
+    display_report(report)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
@@ -0,0 +1,249 @@
+from copy import deepcopy
+from typing import Callable, NamedTuple
+
+from maze import Direction, Layout, Maze, MazeState
+from search import make_frontier
+
+
+class MacroEdge(NamedTuple):
+    """A slide followed by every forced slide after it, up to a decision point."""
+
+    directions: tuple[Direction, ...]
+    landings: tuple[int, ...]  # Cell reached after each step, a decision point last
+    prefix_masks: tuple[int, ...]  # Cells colored after each step, cumulative
+    prefix_lengths: tuple[int, ...]  # Cells crossed after each step, cumulative
+
+    @property
+    def landing(self) -> int:
+        return self.landings[-1]
+
+    @property
+    def mask(self) -> int:
+        return self.prefix_masks[-1]
+
+    @property
+    def length(self) -> int:
+        return self.prefix_lengths[-1]
+
+
+class MoveGraph:
+    """
+    Slide moves compressed to decision points and the macro-edges between them.
+
+    A landing cell with a single possible slide is not a decision point: the
+    agent has to take that slide next, so it is folded into the edge that led
+    there. Every other landing cell reachable from the start is a node.
+    """
+
+    def __init__(self, layout: Layout, start: int) -> None:
+        self.layout = layout
+        self.edges: dict[int, list[MacroEdge]] = {}
+        self.landing_cells = 0  # Nodes of the uncompressed slide graph
+
+        seen = {start}
+        stack = [start]
+        while stack:
+            cell = stack.pop()
+            for direction in Direction:
+                slide = layout.slides[direction][cell]
+                if slide is not None and slide.landing not in seen:
+                    seen.add(slide.landing)
+                    stack.append(slide.landing)
+        self.landing_cells = len(seen)
+
+        stack = [start]
+        while stack:
+            cell = stack.pop()
+            if cell in self.edges:
+                continue
+            self.edges[cell] = [
+                self.macro_edge(cell, direction)
+                for direction in Direction
+                if layout.slides[direction][cell] is not None
+            ]
+            stack.extend(edge.landing for edge in self.edges[cell])
+
+    def forced(self, cell: int) -> Direction | None:
+        """The only slide possible from `cell`, None if there is a choice."""
+        moves = [
+            direction
+            for direction in Direction
+            if self.layout.slides[direction][cell] is not None
+        ]
+        return moves[0] if len(moves) == 1 else None
+
+    def macro_edge(self, cell: int, direction: Direction) -> MacroEdge:
+        directions = []
+        landings = []
+        masks = []
+        lengths = []
+        mask = 0
+        length = 0
+        visited = {cell}
+        while True:
+            slide = self.layout.slides[direction][cell]
+            directions.append(direction)
+            mask |= slide.mask
+            length += len(slide.cells)
+            masks.append(mask)
+            lengths.append(length)
+            cell = slide.landing
+            landings.append(cell)
+            direction = self.forced(cell)
+            if direction is None or cell in visited:  # Stop on loops of forced moves
+                break
+            visited.add(cell)
+        return MacroEdge(
+            tuple(directions), tuple(landings), tuple(masks), tuple(lengths)
+        )
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def take_edge(self, state: MazeState, edge: MacroEdge) -> tuple[MazeState, int]:
+        """
+        Follow `edge` from `state`, returning the new state and the steps taken.
+
+        The edge is cut short when the last uncolored cell is colored midway, so
+        the cost is never more than that of the plain slides.
+        """
+        layout = self.layout
+        steps = len(edge.directions)
+        if state.colored | edge.mask == layout.open_mask:
+            steps = next(
+                step
+                for step, mask in enumerate(edge.prefix_masks, 1)
+                if state.colored | mask == layout.open_mask
+            )
+        colored = state.colored | edge.prefix_masks[steps - 1]
+        newly_colored = (colored & ~state.colored).bit_count()
+        crossed = edge.prefix_lengths[steps - 1]
+        child = MazeState(
+            layout,
+            colored,
+            edge.landings[steps - 1],
+            state.colored_cells + newly_colored,
+            state.extra_cells_traversed + crossed - newly_colored,
+        )
+        return child, steps
+
+
+class MacroSuccessor:
+    """Search node over decision points; `maze` expands the path into plain moves."""
+
+    __slots__ = (
+        "state",
+        "parent",
+        "directions",
+        "heuristic_function",
+        "cost",
+        "source",
+    )
+
+    def __init__(
+        self,
+        state: MazeState,
+        parent: "MacroSuccessor | None",
+        directions: tuple[Direction, ...],
+        heuristic_function: Callable[[MazeState], int],
+        source: Maze | None = None,
+    ):
+        self.state = state
+        self.parent = parent
+        self.directions = directions
+        self.heuristic_function = heuristic_function
+        self.cost = state.cost + heuristic_function(state) if parent else 0
+        self.source = source  # Only the root node keeps the original maze
+
+    @property
+    def maze(self) -> Maze:
+        """Rebuild the full Maze for this node by replaying its actions."""
+        path = []
+        node = self
+        while node.parent is not None:
+            path.append(node.directions)
+            node = node.parent
+        maze = deepcopy(node.source)
+        for directions in reversed(path):
+            for direction in directions:
+                maze.take_action(direction)
+        return maze
+
+    def generate_successors(self, graph: MoveGraph) -> list["MacroSuccessor"]:
+        """Generate one successor per macro-edge leaving the agent's cell."""
+        successors = []
+        for edge in graph.edges[self.state.agent]:
+            state, steps = graph.take_edge(self.state, edge)
+            successors.append(
+                MacroSuccessor(
+                    state, self, edge.directions[:steps], self.heuristic_function
+                )
+            )
+        return successors
+
+
+def macro_a_star_search(
+    maze: Maze,
+    heuristic_function: Callable[[MazeState], int],
+    verbose: bool = False,
+    frontier: str = "heap",
+) -> tuple[MacroSuccessor, int, int, int]:
+    """
+    A* over the compressed move graph of decision points.
+
+    States are compact MazeStates whose agent always stands on a decision point,
+    and g counts every cell crossed along a macro-edge, so costs and heuristics
+    are exactly those of the plain search.
+    """
+    graph = MoveGraph(maze.layout, maze.agent)
+    frontier = make_frontier(frontier)
+    start = MacroSuccessor(
+        MazeState.from_maze(maze), None, (), heuristic_function, maze
+    )
+    frontier.add_or_update(start, start.cost, key=start.state)
+
+    visited: dict[MazeState, int] = {}
+    searches_done = 0
+    max_frontier_size = 1
+    if verbose:
+        print("\n---------- START OF THE SEARCH ALGORITHM -------------\n")
+        print(
+            f"Move graph: {len(graph)} decision points "
+            f"out of {graph.landing_cells} landing cells\n"
+        )
+
+    while not frontier.is_empty():
+        current_successor = frontier.pop()
+
+        if current_successor.state.goal_reached:
+            if verbose:
+                print("---------- END OF THE SEARCH ALGORITHM -------------")
+            return (
+                current_successor,
+                searches_done,
+                max_frontier_size,
+                len(frontier),
+            )  # Goal state reached
+
+        state = current_successor.state
+        if state in visited and state.cost >= visited[state]:
+            continue
+        visited[state] = state.cost
+        searches_done += 1
+
+        if verbose:
+            print("-----------------------------")
+            print("Searched node", searches_done)
+            print(
+                "Estimated cost of finishing maze through this node:",
+                current_successor.cost,
+            )
+            state.display_info()
+
+        for successor in current_successor.generate_successors(graph):
+            frontier.add_or_update(
+                successor, successor.cost, successor.state.cost, successor.state
+            )
+        max_frontier_size = max(max_frontier_size, len(frontier))
+
+    raise ValueError("Goal state not reached")
@@ -4,55 +4,307 @@
 # ---------------------------------
 
 import argparse
+from contextlib import nullcontext
 from os import getpid
 from time import process_time
 
 from psutil import Process
 
 from analysis import search_analysis
-from heuristic import inadmissible_heuristic_function
+from anytime_search import ara_star_search
+from bounded_search import ida_star_search, sma_star_search
+from heuristic import nearest_uncolored_heuristic
+from macro_search import macro_a_star_search
 from maze import Maze
-from search import a_star_search
+from memory_stats import MemoryStats
+from parallel_search import hda_star_search
+from profiling import SearchStats
+from search import FRONTIERS, a_star_search, in_place_a_star_search
+from search_trace import SearchTrace
+from solution_cache import SolutionCache
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process some integers.")
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Increase output verbosity"
     )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "-c",
+        "--compact",
+        action="store_true",
+        help="Search over compact bitset states instead of full maze copies",
+    )
+    mode.add_argument(
+        "-i",
+        "--in-place",
+        action="store_true",
+        help="Search by applying and undoing moves on one maze instead of copying it",
+    )
+    mode.add_argument(
+        "--ida",
+        action="store_true",
+        help="Use IDA*, keeping at most --max-nodes transposition table entries",
+    )
+    mode.add_argument(
+        "--sma",
+        action="store_true",
+        help="Use SMA*, keeping at most --max-nodes search nodes in memory",
+    )
+    mode.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Use hash-distributed A* over this many worker processes",
+    )
+    mode.add_argument(
+        "--macro",
+        action="store_true",
+        help="Search the move graph of decision points joined by forced slides",
+    )
+    mode.add_argument(
+        "-a",
+        "--anytime",
+        action="store_true",
+        help="Use anytime repairing A*, reporting every improved solution",
+    )
+    parser.add_argument(
+        "-m",
+        "--max-nodes",
+        type=int,
+        help="Memory budget in nodes for --ida and --sma, 100000 if not given",
+    )
+    parser.add_argument(
+        "--weight",
+        type=float,
+        help="Initial heuristic weight for --anytime, 3.0 if not given",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        help="Wall-clock budget in seconds for --anytime",
+    )
+    parser.add_argument(
+        "--max-expansions",
+        type=int,
+        help="Expansion budget for --anytime",
+    )
+    parser.add_argument(
+        "-p",
+        "--prune",
+        action="store_true",
+        help="Drop successors that can no longer color every cell",
+    )
+    parser.add_argument(
+        "-d",
+        "--dominance",
+        action="store_true",
+        help="Drop successors dominated by an already expanded state",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every phase of the A* search and print the breakdown",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Record the peak memory of the A* search and what it was spent on",
+    )
+    parser.add_argument(
+        "--no-tracemalloc",
+        action="store_true",
+        help="With --memory, skip allocation tracing, which slows the search down",
+    )
+    parser.add_argument(
+        "--trace",
+        help="Stream the nodes expanded by the A* search to this JSONL file",
+    )
+    parser.add_argument(
+        "--sample-every",
+        type=int,
+        default=1,
+        help="Write only every n-th expanded node to --trace",
+    )
+    parser.add_argument(
+        "-f",
+        "--frontier",
+        choices=FRONTIERS,
+        default="heap",
+        help="Priority queue used for the frontier",
+    )
+    parser.add_argument(
+        "--maze",
+        help="Solve the maze in this file, e.g. one from generator.py, not a level",
+    )
+    parser.add_argument(
+        "--cache",
+        help="Solution cache directory, solved mazes are replayed from it",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=64,
+        help="Size limit of the solution cache in MB",
+    )
     args = parser.parse_args()
+    other_search = (
+        args.in_place
+        or args.macro
+        or args.ida
+        or args.sma
+        or args.workers
+        or args.anytime
+    )
+    if args.prune and other_search:
+        parser.error("--prune only works with the A* search, with or without -c")
+    if args.dominance and other_search:
+        parser.error("--dominance only works with the A* search, with or without -c")
+    if args.profile and other_search:
+        parser.error("--profile only works with the A* search, with or without -c")
+    if args.memory and other_search:
+        parser.error("--memory only works with the A* search, with or without -c")
+    if args.trace and other_search:
+        parser.error("--trace only works with the A* search, with or without -c")
+    if args.cache and (args.anytime or args.workers or args.ida or args.sma):
+        parser.error("--cache only works with the A* and macro searches")
+    if args.cache and (args.profile or args.memory or args.trace):
+        parser.error("--profile, --memory and --trace need a search, not --cache")
+    if args.max_nodes is not None and not (args.ida or args.sma):
+        parser.error("--max-nodes only works with --ida and --sma")
+    if args.max_nodes is None:
+        args.max_nodes = 100_000
+    if args.weight is not None and not args.anytime:
+        parser.error("--weight only works with --anytime")
+    if args.time_limit is not None and not args.anytime:
+        parser.error("--time-limit only works with --anytime")
+    if args.max_expansions is not None and not args.anytime:
+        parser.error("--max-expansions only works with --anytime")
+    if args.weight is None:
+        args.weight = 3.0
 
     print("Welcome to A* search algorithm for color maze")
-    print(
-        "Difficulty levels range from \033[92measy (1-5)\033[0m, \033[93mnormal (6-10)\033[0m, \033[91mhard (11-15)\033[0m\n"
-    )
-    level = int(input("Please select a maze level: "))
+    if args.maze:
+        maze = Maze(args.maze)
+    else:
+        print(
+            "Difficulty levels range from \033[92measy (1-5)\033[0m, \033[93mnormal (6-10)\033[0m, \033[91mhard (11-15)\033[0m\n"
+        )
+        level = int(input("Please select a maze level: "))
 
-    if level < 1 or level > 15:
-        raise ValueError("Maze level should be between 1 and 15.")
+        if level < 1 or level > 15:
+            raise ValueError("Maze level should be between 1 and 15.")
 
-    maze = Maze(level)
+        maze = Maze(level)
 
+    stats = SearchStats() if args.profile else None
+    memory = (
+        MemoryStats(trace_allocations=not args.no_tracemalloc) if args.memory else None
+    )
+    trace = SearchTrace(args.trace, maze, args.sample_every) if args.trace else None
+    cache = cached = None
+    if args.cache:
+        cache = SolutionCache(args.cache, args.cache_size * 1024 * 1024)
+        # Every option that can change the result or its counters is in the key
+        search_name = "/".join(
+            [args.frontier]
+            + [
+                option
+                for option in ("macro", "in_place", "compact", "prune", "dominance")
+                if getattr(args, option)
+            ]
+        )
+        cache_key = cache.key(maze, "nearest_uncolored", search_name)
     process = Process(getpid())
     mem_before = process.memory_info().rss
     start_cpu = process_time()
 
-    (
+    if args.anytime:
+        solutions = ara_star_search(
+            maze,
+            nearest_uncolored_heuristic,
+            verbose=args.verbose,
+            initial_weight=args.weight,
+            time_limit=args.time_limit,
+            max_expansions=args.max_expansions,
+        )
+    elif cache is not None and (cached := cache.get(cache_key, maze)) is not None:
+        print("Solution replayed from the cache")
+        result = cached
+    elif args.workers:
+        result = hda_star_search(
+            maze,
+            nearest_uncolored_heuristic,
+            verbose=args.verbose,
+            workers=args.workers,
+        )
+    elif args.ida:
+        result = ida_star_search(
+            maze,
+            nearest_uncolored_heuristic,
+            verbose=args.verbose,
+            table_size=args.max_nodes,
+        )
+    elif args.sma:
+        result = sma_star_search(
+            maze,
+            nearest_uncolored_heuristic,
+            verbose=args.verbose,
+            max_nodes=args.max_nodes,
+        )
+    elif args.macro:
+        result = macro_a_star_search(
+            maze,
+            nearest_uncolored_heuristic,
+            verbose=args.verbose,
+            frontier=args.frontier,
+        )
+    elif args.in_place:
+        result = in_place_a_star_search(
+            maze,
+            nearest_uncolored_heuristic,
+            verbose=args.verbose,
+            frontier=args.frontier,
+        )
+    else:
+        with trace or nullcontext():  # Flushes the trace even if the search fails
+            result = a_star_search(
+                maze,
+                nearest_uncolored_heuristic,
+                verbose=args.verbose,
+                compact=args.compact,
+                frontier=args.frontier,
+                prune=args.prune,
+                dominance=args.dominance,
+                stats=stats,
+                trace=trace,
+                memory=memory,
+            )
+    if cache is not None and cached is None:
+        cache.put(cache_key, maze, "nearest_uncolored", search_name, result)
+    if not args.anytime:
+        solutions = [(*result, None)]  # One final solution with no bound to report
+
+    for (
         successor,
         searches_done,
         max_frontier_size,
         final_frontier_size,
-    ) = a_star_search(maze, inadmissible_heuristic_function, verbose=args.verbose)
-
-    cpu_time = process_time() - start_cpu
-    mem_used = (
-        (process.memory_info().rss - mem_before) / 1024 / 1024
-    )  # Convert bytes to megabytes
+        bound,
+    ) in solutions:
+        cpu_time = process_time() - start_cpu
+        mem_used = (
+            (process.memory_info().rss - mem_before) / 1024 / 1024
+        )  # Convert bytes to megabytes
 
-    search_analysis(
-        successor,
-        searches_done,
-        final_frontier_size,
-        max_frontier_size,
-        cpu_time,
-        mem_used,
-    )
+        search_analysis(
+            successor,
+            searches_done,
+            final_frontier_size,
+            max_frontier_size,
+            cpu_time,
+            mem_used,
+            bound,
+            stats,
+            memory,
+        )
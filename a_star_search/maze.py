@@ -1,7 +1,10 @@
 from enum import Enum
 from pathlib import Path
+from random import Random
+from typing import NamedTuple
 
 MAZE_DIR = Path("mazes")
+ZOBRIST_SEED = 404  # Fixed so hashes are reproducible between runs
 
 
 class Direction(Enum):
@@ -14,91 +17,161 @@ class Direction(Enum):
         return self.name
 
 
-class Maze:
-    def __init__(self, level: int) -> None:
-        self.map: list[list[str]] = []
-        self.agent_pos: tuple[int, int] = (-1, -1)
-        self.empty_cells: int = 0
-        self.colored_cells: int = 0
-        self.extra_cells_traversed: int = 0
-        self.color_goal: int = 0
-        self.actions: list[Direction] = []
-        self.movement_history: list[
-            tuple[tuple[int, int], list]
-        ] = []  # Track movements for undoing actions
+class Slide(NamedTuple):
+    """Precomputed outcome of one move: where the agent lands and what it crosses."""
 
-        maze_path = MAZE_DIR / f"lvl{level}.txt"
-        with maze_path.open("r", encoding="utf-8") as file:
-            for x, row in enumerate(file):
-                self.map.append([])
-                for y, column in enumerate(row.strip().split(" ")):
-                    match column:
-                        case "S":
-                            if self.agent_pos != (-1, -1):
-                                raise ValueError("Multiple agent symbol detected.")
-                            self.agent_pos = (x, y)
-                            self.map[x].append("C")
-                            self.colored_cells += 1
-                        case "C":
-                            self.map[x].append("C")
-                            self.colored_cells += 1
-                        case "0":
-                            self.map[x].append("0")
-                            self.empty_cells += 1
-                        case "X":
-                            self.map[x].append("X")
-                        case _:
-                            raise ValueError("Unexpected maze symbol.")
-        self.color_goal = self.empty_cells + self.colored_cells
-        if self.agent_pos == (-1, -1):
-            raise ValueError("No agent (S) is found at the maze")
+    landing: int  # Flat index of the cell the agent stops on
+    cells: tuple[int, ...]  # Flat indices passed over, in order, landing included
+    mask: int  # Bitset of `cells`
 
-    def take_action(self, direction: Direction, get_colored: bool = False) -> bool:
+
+class Layout:
+    """Static wall layout of a maze, shared by every state built on top of it."""
+
+    __slots__ = (
+        "rows",
+        "cols",
+        "open_mask",
+        "open_cells",
+        "zobrist_cells",
+        "zobrist_agent",
+        "slides",
+        "distance_rings",
+        "reachable_masks",
+    )
+
+    def __init__(self, grid: list[list[str]]) -> None:
+        self.rows: int = len(grid)
+        self.cols: int = max((len(row) for row in grid), default=0)
+        self.open_mask: int = 0  # Bit i is set when flat index i is not a wall
+        for x, row in enumerate(grid):
+            for y, cell in enumerate(row):
+                if cell != "X":
+                    self.open_mask |= 1 << self.index((x, y))
+        self.open_cells: int = self.open_mask.bit_count()
+
+        # Random 64-bit keys per cell, one for "colored" and one for "agent here"
+        rng = Random(ZOBRIST_SEED)
+        size = self.rows * self.cols
+        self.zobrist_cells: list[int] = [rng.getrandbits(64) for _ in range(size)]
+        self.zobrist_agent: list[int] = [rng.getrandbits(64) for _ in range(size)]
+
+        # Walls never move, so every slide from every open cell is known up front
+        self.slides: dict[Direction, list[Slide | None]] = {
+            direction: [self.slide(index, direction) for index in range(size)]
+            for direction in Direction
+        }
+        # Filled lazily by `rings`, one entry per agent cell
+        self.distance_rings: list[list[int] | None] = [None] * size
+        # Filled lazily by `reachable`, one entry per agent cell
+        self.reachable_masks: list[int | None] = [None] * size
+
+    def __copy__(self) -> "Layout":
+        return self  # Walls never change, so every copy can share one layout
+
+    def __deepcopy__(self, memo: dict) -> "Layout":
+        return self
+
+    def index(self, pos: tuple[int, int]) -> int:
+        return pos[0] * self.cols + pos[1]
+
+    def position(self, index: int) -> tuple[int, int]:
+        return divmod(index, self.cols)
+
+    def zobrist(self, grid: list[list[str]], agent_pos: tuple[int, int]) -> int:
+        """Full Zobrist hash of a grid; Maze keeps it up to date incrementally."""
+        key = self.zobrist_agent[self.index(agent_pos)]
+        for x, row in enumerate(grid):
+            for y, cell in enumerate(row):
+                if cell == "C":
+                    key ^= self.zobrist_cells[self.index((x, y))]
+        return key
+
+    def is_open(self, x: int, y: int) -> bool:
+        return (
+            0 <= x < self.rows
+            and 0 <= y < self.cols
+            and bool(self.open_mask >> (x * self.cols + y) & 1)
+        )
+
+    def rings(self, index: int) -> list[int]:
+        """
+        Bitsets of the open cells at walking distance 1, 2, ... from `index`.
+
+        Distances are breadth-first over open neighbours, so they never exceed
+        the number of cells the agent has to cross to get there.
+        """
+        rings = self.distance_rings[index]
+        if rings is None:
+            steps = [direction.value for direction in Direction]
+            rings = []
+            seen = 1 << index
+            frontier = [self.position(index)]
+            while frontier:
+                ring = 0
+                next_frontier = []
+                for x, y in frontier:
+                    for dx, dy in steps:
+                        nx, ny = x + dx, y + dy
+                        if (
+                            self.is_open(nx, ny)
+                            and not seen >> self.index((nx, ny)) & 1
+                        ):
+                            seen |= 1 << self.index((nx, ny))
+                            ring |= 1 << self.index((nx, ny))
+                            next_frontier.append((nx, ny))
+                if ring:
+                    rings.append(ring)
+                frontier = next_frontier
+            self.distance_rings[index] = rings
+        return rings
+
+    def reachable(self, index: int) -> int:
+        """
+        Bitset of every cell that some sequence of slides from `index` crosses.
+
+        Slides ignore colors, so this only depends on where the agent stands.
+        """
+        mask = self.reachable_masks[index]
+        if mask is None:
+            mask = 0
+            seen = {index}
+            stack = [index]
+            while stack:
+                cell = stack.pop()
+                for direction in Direction:
+                    slide = self.slides[direction][cell]
+                    if slide is None:
+                        continue
+                    mask |= slide.mask
+                    if slide.landing not in seen:
+                        seen.add(slide.landing)
+                        stack.append(slide.landing)
+            self.reachable_masks[index] = mask
+        return mask
+
+    def slide(self, index: int, direction: Direction) -> Slide | None:
+        """Walk from `index` until a wall or the edge, None if the move is blocked."""
+        x, y = self.position(index)
+        if not self.is_open(x, y):
+            return None
         dx, dy = direction.value
-        x, y = self.agent_pos
-        initial_pos = self.agent_pos
-        path_taken = []  # Track the path taken during this action
-        action_valid = False
-        try:
-            while True:
-                nx, ny = x + dx, y + dy
-                if nx < 0 or ny < 0 or self.map[nx][ny] == "X":
-                    break
-                action_valid = True
-                if self.map[nx][ny] == "0":
-                    self.empty_cells -= 1
-                    self.colored_cells += 1
-                    path_taken.append(((nx, ny), "0"))  # Record changes
-                    self.map[nx][ny] = "C"
-                elif self.map[nx][ny] == "C":
-                    self.extra_cells_traversed += 1
-                    path_taken.append(((nx, ny), "C"))
-                x, y = nx, ny
-        finally:
-            if action_valid:
-                self.agent_pos = (x, y)
-                self.actions.append(direction)
-                self.movement_history.append(
-                    (initial_pos, path_taken)
-                )  # Record movement
-            return action_valid
+        cells = []
+        while self.is_open(x + dx, y + dy):
+            x, y = x + dx, y + dy
+            cells.append(self.index((x, y)))
+        if not cells:
+            return None
+        mask = 0
+        for cell in cells:
+            mask |= 1 << cell
+        return Slide(cells[-1], tuple(cells), mask)
 
-    def undo_action(self) -> bool:
-        if not self.movement_history:
-            return False  # No actions to undo
 
-        self.agent_pos, path_taken = self.movement_history.pop()
-        for (x, y), cell_type in reversed(path_taken):
-            if cell_type == "0":  # Revert colored cells to empty
-                self.map[x][y] = cell_type
-                self.empty_cells += 1
-                self.colored_cells -= 1
-            elif cell_type == "C":
-                # If reverting a cell that had been colored (i.e., it was "C" before and was traversed),
-                # then decrement extra_cells_traversed as this traversal is being undone.
-                self.extra_cells_traversed -= 1
-        self.actions.pop()
-        return True
+class MazeView:
+    """Read-only behaviour shared by Maze and MazeState."""
+
+    __slots__ = ()
 
     @property
     def cost(self) -> int:
@@ -108,6 +181,12 @@ class Maze:
     def goal_reached(self) -> bool:
         return self.color_goal == self.colored_cells
 
+    @property
+    def dead_end(self) -> bool:
+        """True when some uncolored cell can no longer be crossed by any slide."""
+        layout = self.layout
+        return bool(layout.open_mask & ~self.colored & ~layout.reachable(self.agent))
+
     def display_snapshot(self) -> None:
         print("Red colored cell denotes the agent.\n")
         for x, row in enumerate(self.map):
@@ -134,7 +213,129 @@ class Maze:
         print("Cost of current state:", self.cost)
         print()
 
+
+class Maze(MazeView):
+    def __init__(self, source: int | str | Path | list[list[str]]) -> None:
+        """
+        Load a maze from a level number, a maze file or an in-memory grid.
+
+        Levels are read from `mazes/lvl{level}.txt`. A grid holds the same
+        symbols as the files: "S" for the agent, "C", "0" and "X".
+        """
+        self.map: list[list[str]] = []
+        self.agent_pos: tuple[int, int] = (-1, -1)
+        self.empty_cells: int = 0
+        self.colored_cells: int = 0
+        self.extra_cells_traversed: int = 0
+        self.color_goal: int = 0
+        self.actions: list[Direction] = []
+        self.movement_history: list[
+            tuple[tuple[int, int], list]
+        ] = []  # Track movements for undoing actions
+
+        if isinstance(source, list):
+            grid = source
+        else:
+            if isinstance(source, int):
+                maze_path = MAZE_DIR / f"lvl{source}.txt"
+            else:
+                maze_path = Path(source)
+            with maze_path.open("r", encoding="utf-8") as file:
+                grid = [row.strip().split(" ") for row in file]
+
+        for x, row in enumerate(grid):
+            self.map.append([])
+            for y, column in enumerate(row):
+                match column:
+                    case "S":
+                        if self.agent_pos != (-1, -1):
+                            raise ValueError("Multiple agent symbol detected.")
+                        self.agent_pos = (x, y)
+                        self.map[x].append("C")
+                        self.colored_cells += 1
+                    case "C":
+                        self.map[x].append("C")
+                        self.colored_cells += 1
+                    case "0":
+                        self.map[x].append("0")
+                        self.empty_cells += 1
+                    case "X":
+                        self.map[x].append("X")
+                    case _:
+                        raise ValueError("Unexpected maze symbol.")
+        self.color_goal = self.empty_cells + self.colored_cells
+        if self.agent_pos == (-1, -1):
+            raise ValueError("No agent (S) is found at the maze")
+        self.layout = Layout(self.map)
+        self.zobrist: int = self.layout.zobrist(self.map, self.agent_pos)
+        self.colored: int = 0  # Bitset of colored cells, kept next to the grid
+        for x, row in enumerate(self.map):
+            for y, cell in enumerate(row):
+                if cell == "C":
+                    self.colored |= 1 << self.layout.index((x, y))
+
+    def take_action(self, direction: Direction, get_colored: bool = False) -> bool:
+        layout = self.layout
+        slide = layout.slides[direction][layout.index(self.agent_pos)]
+        if slide is None:
+            return False
+        path_taken = []  # Track the path taken during this action
+        for index in slide.cells:
+            x, y = layout.position(index)
+            if self.map[x][y] == "0":
+                self.empty_cells -= 1
+                self.colored_cells += 1
+                path_taken.append(((x, y), "0"))  # Record changes
+                self.map[x][y] = "C"
+                self.zobrist ^= layout.zobrist_cells[index]
+            else:
+                self.extra_cells_traversed += 1
+                path_taken.append(((x, y), "C"))
+        self.colored |= slide.mask
+        self.zobrist ^= (
+            layout.zobrist_agent[layout.index(self.agent_pos)]
+            ^ layout.zobrist_agent[slide.landing]
+        )
+        self.movement_history.append((self.agent_pos, path_taken))  # Record movement
+        self.agent_pos = layout.position(slide.landing)
+        self.actions.append(direction)
+        return True
+
+    @property
+    def agent(self) -> int:
+        return self.layout.index(self.agent_pos)
+
+    def undo_action(self) -> bool:
+        if not self.movement_history:
+            return False  # No actions to undo
+
+        initial_pos, path_taken = self.movement_history.pop()
+        self.zobrist ^= (
+            self.layout.zobrist_agent[self.layout.index(self.agent_pos)]
+            ^ self.layout.zobrist_agent[self.layout.index(initial_pos)]
+        )
+        self.agent_pos = initial_pos
+        for (x, y), cell_type in reversed(path_taken):
+            if cell_type == "0":  # Revert colored cells to empty
+                self.map[x][y] = cell_type
+                self.zobrist ^= self.layout.zobrist_cells[self.layout.index((x, y))]
+                self.colored &= ~(1 << self.layout.index((x, y)))
+                self.empty_cells += 1
+                self.colored_cells -= 1
+            elif cell_type == "C":
+                # If reverting a cell that had been colored (i.e., it was "C" before and was traversed),
+                # then decrement extra_cells_traversed as this traversal is being undone.
+                self.extra_cells_traversed -= 1
+        self.actions.pop()
+        return True
+
     def __eq__(self, other: "Maze"):
+        # Reject on the incremental hash first, the grid is only compared on a match
+        if (
+            self.zobrist != other.zobrist
+            or self.extra_cells_traversed != other.extra_cells_traversed
+        ):
+            return False
         # Check if all relevant attributes are equal
         return (
             self.map == other.map
@@ -146,16 +347,93 @@ class Maze:
         )
 
     def __hash__(self) -> int:
-        # Hash tuple of all relevant attributes
-        return hash(
-            (
-                tuple(
-                    tuple(row) for row in self.map
-                ),  # Convert list of lists to tuple of tuples for hashing
-                self.agent_pos,
-                self.empty_cells,
-                self.colored_cells,
-                self.extra_cells_traversed,
-                # Include any other attributes here
-            )
+        # The Zobrist key covers the grid and agent position, the counters follow
+        # from the grid except for the extra cells traversed
+        return hash((self.zobrist, self.extra_cells_traversed))
+
+
+class MazeState(MazeView):
+    """
+    Compact search state: a bitset of colored cells and the agent as a flat index.
+
+    The wall layout is shared through `layout`, so a state costs a handful of
+    machine words instead of a full copy of the grid and its action history.
+    Two states are equal when the same cells are colored and the agent stands on
+    the same cell; how the state was reached is kept by the search nodes.
+    """
+
+    __slots__ = ("layout", "colored", "agent", "colored_cells", "extra_cells_traversed")
+
+    def __init__(
+        self,
+        layout: Layout,
+        colored: int,
+        agent: int,
+        colored_cells: int,
+        extra_cells_traversed: int,
+    ) -> None:
+        self.layout = layout
+        self.colored = colored
+        self.agent = agent
+        self.colored_cells = colored_cells
+        self.extra_cells_traversed = extra_cells_traversed
+
+    @classmethod
+    def from_maze(cls, maze: Maze) -> "MazeState":
+        return cls(
+            maze.layout,
+            maze.colored,
+            maze.agent,
+            maze.colored_cells,
+            maze.extra_cells_traversed,
         )
+
+    @property
+    def color_goal(self) -> int:
+        return self.layout.open_cells
+
+    @property
+    def empty_cells(self) -> int:
+        return self.layout.open_cells - self.colored_cells
+
+    @property
+    def agent_pos(self) -> tuple[int, int]:
+        return self.layout.position(self.agent)
+
+    @property
+    def map(self) -> list[list[str]]:
+        """Render the state as the grid format used by Maze."""
+        layout = self.layout
+        grid = []
+        for x in range(layout.rows):
+            row = []
+            for y in range(layout.cols):
+                bit = 1 << layout.index((x, y))
+                if not layout.open_mask & bit:
+                    row.append("X")
+                elif self.colored & bit:
+                    row.append("C")
+                else:
+                    row.append("0")
+            grid.append(row)
+        return grid
+
+    def take_action(self, direction: Direction) -> "MazeState | None":
+        """Return the state after sliding in `direction`, or None if blocked."""
+        slide = self.layout.slides[direction][self.agent]
+        if slide is None:
+            return None
+        newly_colored = (slide.mask & ~self.colored).bit_count()
+        return MazeState(
+            self.layout,
+            self.colored | slide.mask,
+            slide.landing,
+            self.colored_cells + newly_colored,
+            self.extra_cells_traversed + len(slide.cells) - newly_colored,
+        )
+
+    def __eq__(self, other: "MazeState"):
+        return self.colored == other.colored and self.agent == other.agent
+
+    def __hash__(self) -> int:
+        return hash((self.colored, self.agent))
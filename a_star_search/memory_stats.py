@@ -0,0 +1,146 @@
+import resource
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from sys import getsizeof
+from typing import Iterator
+
+from maze import Maze, MazeState
+
+CONTAINERS = (list, tuple, dict, set, deque)
+
+
+class MemoryStats:
+    """
+    True peak memory of a search, with a breakdown of where it went.
+
+    With `trace_allocations`, tracemalloc follows every allocation while the
+    search runs, so the peak is exact rather than a difference of RSS readings;
+    this slows the search down several times. The peak RSS of the process is
+    always recorded. The breakdown comes from size accounting of the frontier,
+    the visited set, the search nodes and the maze states. It is redone
+    whenever the search has grown by `growth` since the last time, which keeps
+    the total cost linear, and the largest one is kept.
+    """
+
+    def __init__(self, growth: float = 1.5, trace_allocations: bool = True):
+        self.growth = growth
+        self.trace_allocations = trace_allocations
+        self.peak = 0  # Bytes, from tracemalloc
+        self.peak_rss = 0  # Bytes, high-water mark of the whole process
+        self.breakdown: dict[str, int] = {}
+        self.breakdown_items = 0  # Frontier plus visited entries at the breakdown
+        self.next_sample = 0
+        self.active = False
+
+    @contextmanager
+    def recording(self) -> Iterator["MemoryStats"]:
+        started = self.trace_allocations and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+        self.active = True
+        try:
+            yield self
+        finally:
+            if tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                self.peak = max(self.peak, peak - baseline)
+            if started:
+                tracemalloc.stop()
+            self.active = False
+            self.peak_rss = (
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            )  # Linux reports kilobytes
+
+    def sample(self, frontier, *closed_sets, force: bool = False) -> None:
+        """Account for the structures if they grew enough since the last time."""
+        items = len(frontier) + sum(len(closed) for closed in closed_sets)
+        if items < self.next_sample and not force:
+            return
+        self.next_sample = max(items + 1, int(items * self.growth))
+        seen: set[int] = set()
+        leaves: list = []
+        breakdown = {
+            "frontier": container_size(vars(frontier), seen, leaves),
+            "visited set": sum(
+                container_size(closed, seen, leaves) for closed in closed_sets
+            ),
+            "search nodes": 0,
+            "maze states": 0,
+        }
+        for leaf in leaves:
+            if isinstance(leaf, (Maze, MazeState)):
+                breakdown["maze states"] += state_size(leaf, seen)
+                continue
+            node = leaf  # Walk up to every ancestor the node keeps alive
+            while node is not None and id(node) not in seen:
+                seen.add(id(node))
+                breakdown["search nodes"] += getsizeof(node)
+                if hasattr(node, "__dict__"):
+                    breakdown["search nodes"] += getsizeof(vars(node))
+                breakdown["maze states"] += state_size(node.state, seen)
+                node = getattr(node, "parent", None)
+        if sum(breakdown.values()) > sum(self.breakdown.values()):
+            self.breakdown = breakdown
+            self.breakdown_items = items
+
+    def display_info(self) -> None:
+        if self.peak:
+            print(f"Peak traced memory: {self.peak / 1024 / 1024:.3f} MB")
+        print(f"Peak RSS of the process: {self.peak_rss / 1024 / 1024:.3f} MB")
+        if not self.breakdown:
+            return
+        total = sum(self.breakdown.values())
+        print(
+            f"Largest accounted footprint: {total / 1024 / 1024:.3f} MB "
+            f"over {self.breakdown_items} frontier and visited entries"
+        )
+        for structure, size in self.breakdown.items():
+            print(
+                f"  {structure:<14}{size / 1024 / 1024:>10.3f} MB"
+                f"{size / total if total else 0:>8.1%}"
+            )
+
+
+def container_size(obj, seen: set[int], leaves: list) -> int:
+    """
+    Size of nested containers, without the nodes and states they hold.
+
+    Anything that is not a container or a plain value is handed back through
+    `leaves` so it can be accounted for on its own.
+    """
+    if id(obj) in seen or obj is None or callable(obj):
+        return 0
+    if not isinstance(obj, CONTAINERS):
+        if not isinstance(obj, (int, float, str, bool)):
+            leaves.append(obj)  # Marked as seen when it is accounted for
+            return 0
+        seen.add(id(obj))
+        return getsizeof(obj)
+    seen.add(id(obj))
+    size = getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += container_size(key, seen, leaves)
+            size += container_size(value, seen, leaves)
+    else:
+        for item in obj:
+            size += container_size(item, seen, leaves)
+    return size
+
+
+def state_size(state: Maze | MazeState, seen: set[int]) -> int:
+    """Size of a state, with the grid and undo history of a full Maze."""
+    if id(state) in seen:
+        return 0
+    seen.add(id(state))
+    size = getsizeof(state) + getsizeof(state.colored)
+    if isinstance(state, Maze):
+        size += getsizeof(vars(state))
+        size += container_size(state.map, seen, [])
+        size += container_size(state.actions, seen, [])
+        size += container_size(state.movement_history, seen, [])
+    return size
@@ -0,0 +1,255 @@
+import heapq
+import multiprocessing
+from copy import deepcopy
+from queue import Empty
+from time import sleep
+from typing import Callable
+
+from maze import Direction, Layout, Maze, MazeState
+from search import Successor
+
+DIRECTIONS = list(Direction)  # Paths travel between workers as bytes of indices
+
+
+def owner(colored: int, agent: int, workers: int) -> int:
+    """Worker that owns a state; int and tuple hashes agree across processes."""
+    return hash((colored, agent)) % workers
+
+
+def hda_worker(
+    rank: int,
+    workers: int,
+    layout: Layout,
+    heuristic_function: Callable[[MazeState], int],
+    batch_size: int,
+    inboxes: list,
+    results,
+    stats,
+    in_flight,
+    activity,
+    incumbent,
+    idle,
+    stop,
+) -> None:
+    """
+    Run one HDA* worker until the coordinator sets `stop`.
+
+    The worker owns every state that hashes to `rank`: it keeps their open and
+    closed entries and expands them. Children owned by another worker are sent
+    to its inbox in batches of `batch_size` nodes. A node is a tuple of
+    (f, g, colored, agent, colored_cells, extra_cells_traversed, path).
+    """
+    inbox = inboxes[rank]
+    open_nodes: list = []
+    closed: dict[tuple[int, int], int] = {}
+    outboxes: list[list] = [[] for _ in range(workers)]
+    counter = 0
+    searches_done = 0
+    max_frontier_size = 0
+
+    def push(node: tuple) -> None:
+        nonlocal counter
+        f, g, colored, agent = node[:4]
+        if f < incumbent.value and closed.get((colored, agent), g + 1) > g:
+            heapq.heappush(open_nodes, (f, -g, counter, node))
+            counter += 1
+
+    def send(target: int) -> None:
+        batch = outboxes[target]
+        if batch:
+            outboxes[target] = []
+            with in_flight.get_lock():
+                in_flight.value += len(batch)
+            inboxes[target].put(batch)
+
+    while not stop.is_set():
+        try:
+            batch = inbox.get_nowait() if not idle[rank] else inbox.get(timeout=0.01)
+        except Empty:
+            batch = None
+        if batch is not None:
+            with activity.get_lock():
+                activity.value += 1
+                idle[rank] = 0
+            for node in batch:
+                push(node)
+            with in_flight.get_lock():
+                in_flight.value -= len(batch)
+            max_frontier_size = max(max_frontier_size, len(open_nodes))
+            continue
+
+        if not open_nodes or open_nodes[0][0] >= incumbent.value:
+            for target in range(workers):
+                send(target)
+            idle[rank] = 1  # Nothing here can beat the incumbent any more
+            continue
+
+        *_, (f, g, colored, agent, colored_cells, extra, path) = heapq.heappop(
+            open_nodes
+        )
+        if closed.get((colored, agent), g + 1) <= g:
+            continue  # Stale entry, the state was reached more cheaply since
+        closed[(colored, agent)] = g
+
+        if colored_cells == layout.open_cells:
+            with incumbent.get_lock():
+                if g < incumbent.value:
+                    incumbent.value = g
+                    results.put((g, path))
+            continue
+
+        searches_done += 1
+        state = MazeState(layout, colored, agent, colored_cells, extra)
+        for index, direction in enumerate(DIRECTIONS):
+            child = state.take_action(direction)
+            if child is None:
+                continue
+            child_g = child.cost
+            node = (
+                child_g + heuristic_function(child),
+                child_g,
+                child.colored,
+                child.agent,
+                child.colored_cells,
+                child.extra_cells_traversed,
+                path + bytes((index,)),
+            )
+            target = owner(child.colored, child.agent, workers)
+            if target == rank:
+                push(node)
+            else:
+                outboxes[target].append(node)
+                if len(outboxes[target]) >= batch_size:
+                    send(target)
+        max_frontier_size = max(max_frontier_size, len(open_nodes))
+        if searches_done % batch_size == 0:  # Don't let small batches go stale
+            for target in range(workers):
+                send(target)
+
+    for queue in inboxes:
+        queue.cancel_join_thread()  # Undelivered nodes are not needed any more
+    stats.put((searches_done, max_frontier_size, len(open_nodes)))
+
+
+def hda_star_search(
+    maze: Maze,
+    heuristic_function: Callable[[MazeState], int],
+    verbose: bool = False,
+    workers: int = 4,
+    batch_size: int = 64,
+) -> tuple[Successor, int, int, int]:
+    """
+    Hash-distributed A* (HDA*) over a pool of worker processes.
+
+    Every state is owned by the worker its hash maps to, and generated nodes are
+    shipped to their owner in batches. Goals found by any worker tighten a shared
+    incumbent cost. The search ends once every worker is idle, meaning it holds
+    no node with f below the incumbent, and no batch is in flight. Frontier
+    sizes are summed over the workers.
+    """
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    stats = context.Queue()
+    in_flight = context.Value("q", 0)
+    activity = context.Value("q", 0)
+    incumbent = context.Value("d", float("inf"))
+    idle = context.Array("b", workers)
+    stop = context.Event()
+
+    processes = [
+        context.Process(
+            target=hda_worker,
+            args=(
+                rank,
+                workers,
+                maze.layout,
+                heuristic_function,
+                batch_size,
+                inboxes,
+                results,
+                stats,
+                in_flight,
+                activity,
+                incumbent,
+                idle,
+                stop,
+            ),
+            daemon=True,
+        )
+        for rank in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    root = MazeState.from_maze(maze)
+    with in_flight.get_lock():
+        in_flight.value += 1
+    inboxes[owner(root.colored, root.agent, workers)].put(
+        [
+            (
+                root.cost + heuristic_function(root),
+                root.cost,
+                root.colored,
+                root.agent,
+                root.colored_cells,
+                root.extra_cells_traversed,
+                b"",
+            )
+        ]
+    )
+
+    def finished() -> bool:
+        # Workers only send while busy and count a batch in `in_flight` before
+        # queueing it, and they bump `activity` before leaving idle. If every
+        # worker is idle and `activity` stays unchanged until after `in_flight`
+        # is read, nobody sent anything since, so `in_flight` covers every batch
+        before = activity.value
+        if not all(idle) or in_flight.value:
+            return False
+        return activity.value == before
+
+    best = None
+
+    def collect(block: bool) -> None:
+        nonlocal best
+        solution = results.get() if block else results.get_nowait()
+        if best is None or solution[0] < best[0]:
+            best = solution
+            if verbose:
+                print("Found a solution with cost", solution[0])
+
+    while not finished():
+        sleep(0.01)
+        try:
+            while True:
+                collect(block=False)
+        except Empty:
+            pass
+    # The incumbent is authoritative, its path may still be in the queue's pipe
+    while incumbent.value < float("inf") and (
+        best is None or best[0] > incumbent.value
+    ):
+        collect(block=True)
+
+    stop.set()
+    searches_done = max_frontier_size = final_frontier_size = 0
+    for _ in processes:
+        done, peak, final = stats.get()
+        searches_done += done
+        max_frontier_size += peak
+        final_frontier_size += final
+    for process in processes:
+        process.join()
+
+    if best is None:
+        raise ValueError("Goal state not reached")
+    solved_maze = deepcopy(maze)
+    for index in best[1]:
+        solved_maze.take_action(DIRECTIONS[index])
+    return (
+        Successor(solved_maze, None, heuristic_function),
+        searches_done,
+        max_frontier_size,
+        final_frontier_size,
+    )
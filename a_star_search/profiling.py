@@ -0,0 +1,80 @@
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Iterator
+
+
+class SearchStats:
+    """
+    Per-phase call counts and timers collected while a search runs.
+
+    A search only touches this object when one is passed in, so searches run
+    without it pay nothing. Timed phases wrap a function with `wrap`, plain
+    counters go through `count`.
+    """
+
+    def __init__(self):
+        self.calls: Counter[str] = Counter()
+        self.seconds: Counter[str] = Counter()
+        self.counters: Counter[str] = Counter()
+        self.total_time = 0.0
+        self.active = False
+
+    def wrap(self, phase: str, function: Callable) -> Callable:
+        """Return `function` with every call counted and timed under `phase`."""
+        calls = self.calls
+        seconds = self.seconds
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[phase] += perf_counter() - start
+                calls[phase] += 1
+
+        return timed
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] += amount
+
+    @contextmanager
+    def recording(self, *state_types: type) -> Iterator["SearchStats"]:
+        """
+        Time the whole search and count hash and eq calls on `state_types`.
+
+        The hash and eq methods are swapped on the classes themselves, since
+        dicts call them directly, and put back when the search ends.
+        """
+        originals = [(cls, cls.__hash__, cls.__eq__) for cls in state_types]
+        for cls, hash_method, eq_method in originals:
+            cls.__hash__ = self.wrap("hash", hash_method)
+            cls.__eq__ = self.wrap("eq", eq_method)
+        self.active = True
+        start = perf_counter()
+        try:
+            yield self
+        finally:
+            self.total_time += perf_counter() - start
+            self.active = False
+            for cls, hash_method, eq_method in originals:
+                cls.__hash__ = hash_method
+                cls.__eq__ = eq_method
+
+    def display_info(self) -> None:
+        print(f"Profiled search time: {self.total_time:.3f} seconds\n")
+        print(
+            f"{'Phase':<24}{'Calls':>12}{'Seconds':>12}{'us/call':>12}{'Share':>8}"
+        )
+        for phase, calls in self.calls.most_common():
+            seconds = self.seconds[phase]
+            share = seconds / self.total_time if self.total_time else 0
+            print(
+                f"{phase:<24}{calls:>12}{seconds:>12.3f}"
+                f"{seconds / calls * 1e6:>12.2f}{share:>8.1%}"
+            )
+        print()
+        for counter, value in sorted(self.counters.items()):
+            print(f"{counter.replace('_', ' ').capitalize()}: {value}")
+        print("\nPhases nest: successor generation includes the heuristic calls,")
+        print("and hash and eq calls are made inside the frontier operations.")
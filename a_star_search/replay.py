@@ -0,0 +1,41 @@
+import argparse
+
+from search_trace import read_trace, state_of
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Render nodes from a search trace written with --trace."
+    )
+    parser.add_argument("trace", help="Trace file to read")
+    parser.add_argument(
+        "nodes",
+        type=int,
+        nargs="*",
+        help="Ids of the nodes to render, the goal node if none are given",
+    )
+    parser.add_argument(
+        "-p",
+        "--path",
+        action="store_true",
+        help="Also render the traced ancestors of every chosen node",
+    )
+    args = parser.parse_args()
+
+    try:
+        layout, records = read_trace(args.trace)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{len(records)} nodes in the trace, ids {min(records)} to {max(records)}\n")
+    node_ids = args.nodes or [max(records)]
+    for node_id in node_ids:
+        if node_id not in records:
+            raise ValueError(f"Node {node_id} was not sampled into this trace.")
+        chain = [records[node_id]]
+        while args.path and chain[-1]["parent"] in records:
+            chain.append(records[chain[-1]["parent"]])
+        for record in reversed(chain):
+            print("-----------------------------")
+            print(f"Node {record['id']}, parent {record['parent']}")
+            print(f"Action: {record['action']}")
+            print(f"f = {record['f']}, g = {record['g']}, h = {record['h']}\n")
+            state_of(layout, record).display_info()
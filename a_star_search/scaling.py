@@ -0,0 +1,141 @@
+import argparse
+import json
+import multiprocessing
+import tempfile
+from pathlib import Path
+from statistics import median
+
+from batch import SEARCHES, parse_heuristics, run_batch
+from generator import generate_maze, write_maze
+
+
+def generate_suite(
+    sizes: list[int], density: float, seeds: int, directory: Path
+) -> dict[str, dict]:
+    """Write `seeds` mazes of every size to `directory`, described by file name."""
+    mazes = {}
+    for size in sizes:
+        for seed in range(seeds):
+            grid = generate_maze(size, size, density, seed)
+            path = directory / f"gen_{size}x{size}_d{density}_s{seed}.txt"
+            write_maze(grid, path)
+            mazes[str(path)] = {
+                "size": size,
+                "seed": seed,
+                "open_cells": sum(row.count("0") for row in grid) + 1,
+            }
+    return mazes
+
+
+def summarize(records: list[dict], mazes: dict[str, dict]) -> list[dict]:
+    """One row per size and heuristic, with medians over the solved seeds."""
+    groups: dict[tuple[int, str], list[dict]] = {}
+    for record in records:
+        size = mazes[record["level"]]["size"]
+        groups.setdefault((size, record["heuristic"]), []).append(record)
+    rows = []
+    for (size, heuristic), group in sorted(groups.items()):
+        solved = [record for record in group if record["status"] == "solved"]
+        row = {
+            "size": size,
+            "heuristic": heuristic,
+            "open_cells": median(
+                mazes[record["level"]]["open_cells"] for record in group
+            ),
+            "solved": len(solved),
+            "runs": len(group),
+        }
+        for field in ["cpu_time", "searches_done", "peak_memory_mb"]:
+            row[field] = median(record[field] for record in solved) if solved else None
+        rows.append(row)
+    return rows
+
+
+def display_rows(rows: list[dict]) -> None:
+    print(
+        f"{'Size':>7}{'Heuristic':>20}{'Open':>8}{'Solved':>9}"
+        f"{'CPU (s)':>10}{'Expanded':>12}{'Peak MB':>10}"
+    )
+    for row in rows:
+        solved = f"{row['solved']}/{row['runs']}"
+        if row["solved"]:
+            measured = (
+                f"{row['cpu_time']:>10.3f}{row['searches_done']:>12.0f}"
+                f"{row['peak_memory_mb']:>10.1f}"
+            )
+        else:
+            measured = f"{'-':>10}{'-':>12}{'-':>10}"
+        print(
+            f"{row['size']:>7}{row['heuristic']:>20}{row['open_cells']:>8.0f}"
+            f"{solved:>9}{measured}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure how the search scales on generated mazes of growing size."
+    )
+    parser.add_argument(
+        "-S",
+        "--sizes",
+        default="6,8,10,12,14",
+        help="Comma separated side lengths, including the border walls",
+    )
+    parser.add_argument(
+        "-d", "--density", type=float, default=0.25, help="Share of inner walls"
+    )
+    parser.add_argument(
+        "-n", "--seeds", type=int, default=5, help="Mazes generated per size"
+    )
+    parser.add_argument(
+        "-H",
+        "--heuristics",
+        default="monotonic,nearest_uncolored",
+        help="Comma separated heuristics, or all",
+    )
+    parser.add_argument(
+        "-s",
+        "--search",
+        choices=SEARCHES,
+        default="compact",
+        help="Search variant to run every maze with",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help="Number of searches to run at once",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=60,
+        help="Wall-clock limit per search in seconds",
+    )
+    parser.add_argument(
+        "-m", "--memory-limit", type=int, help="Address space limit per search in MB"
+    )
+    parser.add_argument(
+        "-k", "--keep", help="Directory to keep the generated mazes in"
+    )
+    parser.add_argument("-o", "--output", help="File to write the summary rows to")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    heuristics = parse_heuristics(args.heuristics)
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = Path(args.keep or scratch)
+        directory.mkdir(parents=True, exist_ok=True)
+        mazes = generate_suite(sizes, args.density, args.seeds, directory)
+        jobs = [
+            (path, heuristic, args.search) for path in mazes for heuristic in heuristics
+        ]
+        records = list(run_batch(jobs, args.jobs, args.timeout, args.memory_limit))
+
+    rows = summarize(records, mazes)
+    display_rows(rows)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(rows, file, indent=2)
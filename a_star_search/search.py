@@ -1,8 +1,13 @@
 import heapq
+from collections import deque
+from contextlib import ExitStack
 from copy import deepcopy
 from typing import Callable
 
-from maze import Direction, Maze
+from maze import Direction, Maze, MazeState
+from memory_stats import MemoryStats
+from profiling import SearchStats
+from search_trace import SearchTrace
 
 
 class Successor:
@@ -21,6 +26,10 @@ class Successor:
             0 if direction is None else self.apply_action()
         )  # Apply action if not the initial state
 
+    @property
+    def state(self) -> Maze:
+        return self.maze
+
     def apply_action(self) -> int:
         """Apply the action to the maze, if valid, and return the updated cost."""
         if self.direction and self.maze.take_action(self.direction):
@@ -41,52 +50,473 @@ class Successor:
         return successors
 
 
+class CompactSuccessor:
+    """
+    Search node that stores a MazeState and a parent pointer instead of a Maze copy.
+
+    The full Maze, with its action and undo history, is only rebuilt on demand
+    through the `maze` property by replaying the actions from the root node.
+    """
+
+    __slots__ = ("state", "parent", "direction", "heuristic_function", "cost", "source")
+
+    def __init__(
+        self,
+        state: MazeState,
+        parent: "CompactSuccessor | None",
+        direction: Direction | None,
+        heuristic_function: Callable[[MazeState], int],
+        source: Maze | None = None,
+    ):
+        self.state = state
+        self.parent = parent
+        self.direction = direction
+        self.heuristic_function = heuristic_function
+        self.cost = state.cost + heuristic_function(state) if parent else 0
+        self.source = source  # Only the root node keeps the original maze
+
+    @classmethod
+    def root(
+        cls, maze: Maze, heuristic_function: Callable[[MazeState], int]
+    ) -> "CompactSuccessor":
+        return cls(MazeState.from_maze(maze), None, None, heuristic_function, maze)
+
+    @property
+    def maze(self) -> Maze:
+        """Rebuild the full Maze for this node by replaying its actions."""
+        directions = []
+        node = self
+        while node.parent is not None:
+            directions.append(node.direction)
+            node = node.parent
+        maze = deepcopy(node.source)
+        for direction in reversed(directions):
+            maze.take_action(direction)
+        return maze
+
+    def generate_successors(self) -> list["CompactSuccessor"]:
+        """Generate successors for each possible direction from the current state."""
+        successors = []
+        for direction in Direction:
+            state = self.state.take_action(direction)
+            if state is not None:  # If the action led to a valid state
+                successors.append(
+                    CompactSuccessor(state, self, direction, self.heuristic_function)
+                )
+        return successors
+
+
+class PathNode:
+    """
+    Search node for in-place search: a parent pointer, the action and g/h values.
+
+    The state itself lives in one shared working maze, which is moved to a node
+    with `restore` when that node is popped from the frontier.
+    """
+
+    __slots__ = ("parent", "direction", "depth", "g", "h", "cost", "zobrist")
+
+    def __init__(
+        self,
+        parent: "PathNode | None",
+        direction: Direction | None,
+        g: int,
+        h: int,
+        zobrist: int,
+    ):
+        self.parent = parent
+        self.direction = direction
+        self.depth = parent.depth + 1 if parent else 0
+        self.g = g
+        self.h = h
+        self.cost = g + h if parent else 0
+        self.zobrist = zobrist  # Identifies the maze state reached by this node
+
+    def restore(self, maze: Maze, current: "PathNode") -> None:
+        """Move `maze` from the state of `current` to the state of this node."""
+        target = self
+        redo = []
+        while current.depth > target.depth:
+            maze.undo_action()
+            current = current.parent
+        while target.depth > current.depth:
+            redo.append(target.direction)
+            target = target.parent
+        while current is not target:  # Climb both sides to the common ancestor
+            maze.undo_action()
+            current = current.parent
+            redo.append(target.direction)
+            target = target.parent
+        for direction in reversed(redo):
+            maze.take_action(direction)
+
+    def generate_successors(
+        self, maze: Maze, heuristic_function: Callable[[Maze], int]
+    ) -> list["PathNode"]:
+        """Score each direction by apply, evaluate, undo on the working maze."""
+        successors = []
+        for direction in Direction:
+            if maze.take_action(direction):
+                successors.append(
+                    PathNode(
+                        self,
+                        direction,
+                        maze.cost,
+                        heuristic_function(maze),
+                        maze.zobrist,
+                    )
+                )
+                maze.undo_action()
+        return successors
+
+
 class Frontier:
+    """
+    Binary heap with lazy deletion.
+
+    Entries are ordered by priority, then by higher g, then by insertion order.
+    Replaced entries are left in the heap as tombstones and compacted away once
+    they outnumber the live ones, so `len` is always the real frontier size.
+    """
+
     def __init__(self):
         self.elements = []
         self.entry_finder = {}  # map from item to entries
         self.counter = 0  # unique sequence count
+        self.stale = 0  # tombstones still sitting in the heap
+        self.stale_pops = 0  # tombstones popped and thrown away so far
 
-    def add_or_update(self, node: Successor, priority: int):
-        if node in self.entry_finder:
-            self.remove(node)
-        entry = [priority, self.counter, node]
-        self.entry_finder[node] = entry
+    def add_or_update(self, node: Successor, priority: int, g: int = 0, key=None):
+        """
+        Queue `node` by `key` (default: itself) unless a better entry exists.
+
+        Returns whether `node` was queued, replacing any worse entry for `key`.
+        """
+        key = node if key is None else key
+        if key in self.entry_finder:
+            entry = self.entry_finder[key]
+            if entry[:2] <= [priority, -g]:
+                return False
+            self.remove(key)
+        entry = [priority, -g, self.counter, key, node]
+        self.entry_finder[key] = entry
         heapq.heappush(self.elements, entry)
         self.counter += 1
+        return True
 
-    def remove(self, node: Successor):
-        entry = self.entry_finder.pop(node)
+    def remove(self, key):
+        entry = self.entry_finder.pop(key)
         entry[-1] = None
+        self.stale += 1
+        if self.stale > len(self.entry_finder):
+            self.elements = [entry for entry in self.elements if entry[-1] is not None]
+            heapq.heapify(self.elements)
+            self.stale = 0
 
     def pop(self) -> Successor:
         while self.elements:
-            priority, _, node = heapq.heappop(self.elements)
+            *_, key, node = heapq.heappop(self.elements)
+            if node is not None:
+                del self.entry_finder[key]
+                return node
+            self.stale -= 1
+            self.stale_pops += 1
+        raise KeyError("pop from an empty priority queue")
+
+    def is_empty(self):
+        return not self.entry_finder
+
+    def __len__(self) -> int:
+        return len(self.entry_finder)
+
+
+class BucketFrontier:
+    """
+    Bucket queue for integer f-costs.
+
+    Nodes are bucketed by priority and then by g, so pushing is O(1) and popping
+    only looks at the handful of distinct f and g values currently queued.
+    Higher g wins ties, equal entries come out in insertion order.
+    """
+
+    def __init__(self):
+        self.buckets: dict[int, dict[int, deque]] = {}
+        self.entry_finder = {}  # map from item to entries
+        self.min_priority = None
+        self.stale_pops = 0  # replaced entries popped and thrown away so far
+
+    def add_or_update(self, node: Successor, priority: int, g: int = 0, key=None):
+        """
+        Queue `node` by `key` (default: itself) unless a better entry exists.
+
+        Returns whether `node` was queued, replacing any worse entry for `key`.
+        """
+        key = node if key is None else key
+        if key in self.entry_finder:
+            entry = self.entry_finder[key]
+            if (entry[0], -entry[1]) <= (priority, -g):
+                return False
+            self.remove(key)
+        entry = [priority, g, key, node]
+        self.entry_finder[key] = entry
+        self.buckets.setdefault(priority, {}).setdefault(g, deque()).append(entry)
+        if self.min_priority is None or priority < self.min_priority:
+            self.min_priority = priority
+        return True
+
+    def remove(self, key):
+        entry = self.entry_finder.pop(key)
+        entry[-1] = None  # Dropped from its bucket when it reaches the front
+
+    def pop(self) -> Successor:
+        while self.buckets:
+            bucket = self.buckets[self.min_priority]
+            g = max(bucket)
+            queue = bucket[g]
+            _, _, key, node = queue.popleft()
+            if not queue:
+                del bucket[g]
+                if not bucket:
+                    del self.buckets[self.min_priority]
+                    self.min_priority = min(self.buckets, default=None)
             if node is not None:
-                del self.entry_finder[node]
+                del self.entry_finder[key]
                 return node
+            self.stale_pops += 1
         raise KeyError("pop from an empty priority queue")
 
+    def is_empty(self):
+        return not self.entry_finder
+
+    def __len__(self) -> int:
+        return len(self.entry_finder)
+
+
+class IndexedHeapFrontier:
+    """
+    Binary heap that tracks the position of every entry.
+
+    A cheaper path to a queued key updates its entry in place and sifts it up
+    (a true decrease-key), so the heap never holds stale entries.
+    """
+
+    def __init__(self):
+        self.elements = []
+        self.position = {}  # map from item to its index in `elements`
+        self.counter = 0  # unique sequence count
+
+    def add_or_update(self, node: Successor, priority: int, g: int = 0, key=None):
+        """
+        Queue `node` by `key` (default: itself) unless a better entry exists.
+
+        Returns whether `node` was queued, replacing any worse entry for `key`.
+        """
+        key = node if key is None else key
+        if key in self.position:
+            index = self.position[key]
+            entry = self.elements[index]
+            if entry[:2] <= [priority, -g]:
+                return False
+            entry[0], entry[1], entry[-1] = priority, -g, node
+            self.sift_up(index)
+            return True
+        self.elements.append([priority, -g, self.counter, key, node])
+        self.position[key] = len(self.elements) - 1
+        self.sift_up(len(self.elements) - 1)
+        self.counter += 1
+        return True
+
+    def pop(self) -> Successor:
+        if not self.elements:
+            raise KeyError("pop from an empty priority queue")
+        top = self.elements[0]
+        last = self.elements.pop()
+        if self.elements:
+            self.elements[0] = last
+            self.position[last[3]] = 0
+            self.sift_down(0)
+        del self.position[top[3]]
+        return top[-1]
+
+    def sift_up(self, index: int):
+        elements = self.elements
+        entry = elements[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if not entry < elements[parent]:
+                break
+            elements[index] = elements[parent]
+            self.position[elements[index][3]] = index
+            index = parent
+        elements[index] = entry
+        self.position[entry[3]] = index
+
+    def sift_down(self, index: int):
+        elements = self.elements
+        size = len(elements)
+        entry = elements[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and elements[child + 1] < elements[child]:
+                child += 1
+            if not elements[child] < entry:
+                break
+            elements[index] = elements[child]
+            self.position[elements[index][3]] = index
+            index = child
+        elements[index] = entry
+        self.position[entry[3]] = index
+
     def is_empty(self):
         return not self.elements
 
+    def __len__(self) -> int:
+        return len(self.elements)
+
+
+class DominanceIndex:
+    """
+    Closed list that also finds states dominated by an expanded one.
+
+    A state is dominated when an expanded state has the agent on the same cell,
+    every cell it has colored colored too, and a cost no higher: whatever the
+    weaker state can still do, the stronger one can do at no greater cost.
+    Per agent cell the uncolored cells of expanded states are kept in a set-trie.
+    Each trie node remembers the lowest cost below it and the uncolored cells
+    shared by every state below it, so a query skips a branch as soon as it is
+    too expensive or cannot be a subset of the query's uncolored cells.
+    """
+
+    def __init__(self):
+        # agent cell -> trie node [children, min cost, cost, common uncolored mask]
+        self.tries: dict[int, list] = {}
+
+    def add(self, state: Maze | MazeState):
+        cost = state.cost
+        uncolored = state.layout.open_mask & ~state.colored
+        node = self.tries.setdefault(state.agent, [{}, cost, None, uncolored])
+        node[1] = min(node[1], cost)
+        node[3] &= uncolored
+        remaining = uncolored
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            node = node[0].setdefault(low.bit_length() - 1, [{}, cost, None, uncolored])
+            node[1] = min(node[1], cost)
+            node[3] &= uncolored
+        if node[2] is None or cost < node[2]:
+            node[2] = cost
+
+    def dominated(self, state: Maze | MazeState) -> bool:
+        root = self.tries.get(state.agent)
+        cost = state.cost
+        if root is None:
+            return False
+        # Trie paths list cells in ascending order, so any child whose cell is
+        # still uncolored in `state` continues a subset of its uncolored cells
+        uncolored = state.layout.open_mask & ~state.colored
+        stack = [root]
+        while stack:
+            children, min_cost, end_cost, common = stack.pop()
+            if min_cost > cost or common & ~uncolored:
+                continue
+            if end_cost is not None and end_cost <= cost:
+                return True
+            for cell, child in children.items():
+                if uncolored >> cell & 1:
+                    stack.append(child)
+        return False
+
+
+FRONTIERS = {
+    "heap": Frontier,
+    "bucket": BucketFrontier,
+    "indexed": IndexedHeapFrontier,
+}
+
+
+def make_frontier(name: str) -> Frontier | BucketFrontier | IndexedHeapFrontier:
+    if name not in FRONTIERS:
+        raise ValueError(
+            f"Unknown frontier '{name}', expected one of: {', '.join(FRONTIERS)}."
+        )
+    return FRONTIERS[name]()
+
 
 def a_star_search(
     maze: Maze,
     heuristic_function: Callable[[Maze], int],
     verbose: bool = False,
-) -> tuple[Successor, int, int, int]:
-    frontier = Frontier()
-    start = Successor(
-        maze, None, heuristic_function
-    )  # Start state with no initial direction
+    compact: bool = False,
+    frontier: str = "heap",
+    prune: bool = False,
+    dominance: bool = False,
+    stats: SearchStats | None = None,
+    trace: SearchTrace | None = None,
+    memory: MemoryStats | None = None,
+) -> tuple[Successor | CompactSuccessor, int, int, int]:
+    """
+    A* search over full maze copies, or compact states with `compact`.
+
+    With `prune`, successors in which some uncolored cell can no longer be
+    reached by any slide are dropped before they enter the frontier. With
+    `dominance`, so are successors dominated by an already expanded state.
+    Passing `stats` times every phase of the search into it, passing `trace`
+    streams the expanded nodes into it and passing `memory` records the peak
+    memory of the search and what it was spent on.
+    """
+    starting_memory = memory is not None and not memory.active
+    starting_stats = stats is not None and not stats.active
+    if starting_memory or starting_stats:
+        with ExitStack() as recordings:
+            if starting_memory:
+                recordings.enter_context(memory.recording())
+            if starting_stats:
+                recordings.enter_context(stats.recording(Maze, MazeState))
+            return a_star_search(
+                maze,
+                heuristic_function,
+                verbose,
+                compact,
+                frontier,
+                prune,
+                dominance,
+                stats,
+                trace,
+                memory,
+            )
+
+    frontier = make_frontier(frontier)
+    closed = DominanceIndex() if dominance else None
+    generate_successors = (
+        CompactSuccessor.generate_successors
+        if compact
+        else Successor.generate_successors
+    )
+    if stats is not None:
+        heuristic_function = stats.wrap("heuristic", heuristic_function)
+        generate_successors = stats.wrap("successor_generation", generate_successors)
+        frontier.add_or_update = stats.wrap("frontier_push", frontier.add_or_update)
+        frontier.pop = stats.wrap("frontier_pop", frontier.pop)
+        if closed is not None:
+            closed.dominated = stats.wrap("dominance_check", closed.dominated)
+
+    if compact:
+        start = CompactSuccessor.root(maze, heuristic_function)
+    else:
+        start = Successor(
+            maze, None, heuristic_function
+        )  # Start state with no initial direction
 
     frontier.add_or_update(
-        start, start.cost
+        start, start.cost, key=start.state
     )  # Initial priority based on start state cost
 
-    visited: dict[Maze, int] = {}
+    visited: dict[Maze | MazeState, int] = {}
     searches_done = 0
+    pruned = 0
     final_frontier_size = 0
     max_frontier_size = 1
     if verbose:
@@ -105,12 +535,24 @@ def a_star_search(
                     "Estimated cost of finishing maze through this node:",
                     current_successor.cost,
                 )
-            current_successor.maze.display_info()
+            current_successor.state.display_info()
 
-        if current_successor.maze.goal_reached:
+        if current_successor.state.goal_reached:
             if verbose:
                 print("---------- END OF THE SEARCH ALGORITHM -------------")
-            final_frontier_size = len(frontier.elements)
+                if prune or dominance:
+                    print("Successors pruned:", pruned)
+            final_frontier_size = len(frontier)
+            if trace is not None:
+                trace.expand(current_successor, searches_done, goal=True)
+            if memory is not None:
+                memory.sample(
+                    frontier, visited, closed.tries if closed else {}, force=True
+                )
+            if stats is not None:
+                stats.count("expansions", searches_done)
+                stats.count("successors_pruned", pruned)
+                stats.count("stale_pops", getattr(frontier, "stale_pops", 0))
             return (
                 current_successor,
                 searches_done,
@@ -119,22 +561,117 @@ def a_star_search(
             )  # Goal state reached
 
         if (
-            current_successor.maze not in visited
-            or current_successor.maze.cost < visited[current_successor.maze]
-        ):
-            visited[current_successor.maze] = current_successor.maze.cost
+            current_successor.state not in visited
+            or current_successor.state.cost < visited[current_successor.state]
+        ) and not (closed is not None and closed.dominated(current_successor.state)):
+            visited[current_successor.state] = current_successor.state.cost
+            if closed is not None:
+                closed.add(current_successor.state)
+            if trace is not None:
+                trace.expand(current_successor, searches_done)
             searches_done += 1
-            successors = current_successor.generate_successors()
-            for successor in successors:
-                frontier.add_or_update(successor, successor.cost)
+            for successor in generate_successors(current_successor):
+                if (prune and successor.state.dead_end) or (
+                    closed is not None and closed.dominated(successor.state)
+                ):
+                    pruned += 1
+                    continue
+                queued = frontier.add_or_update(
+                    successor,
+                    successor.cost,
+                    successor.state.cost,
+                    successor.state,
+                )
+                if queued and trace is not None:
+                    trace.add_child(searches_done - 1, successor.state)
             max_frontier_size = max(
-                max_frontier_size, len(frontier.elements)
+                max_frontier_size, len(frontier)
             )  # Update max frontier size
+            if memory is not None:
+                memory.sample(frontier, visited, closed.tries if closed else {})
+
+            if verbose:
+                print("Nodes in the frontier:", len(frontier), end="\n\n")
+        else:
+            if trace is not None:
+                trace.skip(current_successor)
+            if stats is not None:
+                stats.count("closed_set_hits")
+            if verbose:
+                print("-----------------------------")
+                print("\033[96mSkipping already visited node..\033[0m")
+
+    raise ValueError("Goal state not reached")
+
+
+def in_place_a_star_search(
+    maze: Maze,
+    heuristic_function: Callable[[Maze], int],
+    verbose: bool = False,
+    frontier: str = "heap",
+) -> tuple[Successor, int, int, int]:
+    """
+    A* search that never copies the maze.
+
+    Children are scored by applying and undoing their action on one working
+    maze, and only the popped node's state is rebuilt. States are told apart by
+    their Zobrist key, and a state is expanded again only when reached cheaper.
+    """
+    working_maze = deepcopy(maze)  # Leave the caller's maze untouched
+    frontier = make_frontier(frontier)
+    start = PathNode(None, None, working_maze.cost, 0, working_maze.zobrist)
+    current_node = start
+
+    frontier.add_or_update(start, start.cost, key=start.zobrist)
+
+    visited: dict[int, int] = {}
+    searches_done = 0
+    final_frontier_size = 0
+    max_frontier_size = 1
+    if verbose:
+        print("\n---------- START OF THE SEARCH ALGORITHM -------------\n")
 
+    while not frontier.is_empty():
+        node = frontier.pop()
+
+        if node.zobrist in visited and node.g >= visited[node.zobrist]:
             if verbose:
-                print("Nodes in the frontier:", len(frontier.elements), end="\n\n")
-        elif verbose:
+                print("-----------------------------")
+                print("\033[96mSkipping already visited node..\033[0m")
+            continue
+
+        node.restore(working_maze, current_node)
+        current_node = node
+
+        if verbose:
             print("-----------------------------")
-            print("\033[96mSkipping already visited node..\033[0m")
+            if searches_done == 0:
+                print("Inital node")
+            else:
+                print("Searched node", searches_done)
+                print("Estimated cost of finishing maze through this node:", node.cost)
+            working_maze.display_info()
+
+        if working_maze.goal_reached:
+            if verbose:
+                print("---------- END OF THE SEARCH ALGORITHM -------------")
+            final_frontier_size = len(frontier)
+            return (
+                Successor(working_maze, None, heuristic_function),
+                searches_done,
+                max_frontier_size,
+                final_frontier_size,
+            )  # Goal state reached
+
+        visited[node.zobrist] = node.g
+        searches_done += 1
+        for successor in node.generate_successors(working_maze, heuristic_function):
+            frontier.add_or_update(
+                successor, successor.cost, successor.g, successor.zobrist
+            )
+        max_frontier_size = max(max_frontier_size, len(frontier))
+
+        if verbose:
+            print("Nodes in the frontier:", len(frontier), end="\n\n")
 
     raise ValueError("Goal state not reached")
@@ -0,0 +1,146 @@
+import json
+from queue import Full, Queue
+from threading import Thread
+
+from maze import Layout, Maze, MazeState
+
+
+class SearchTrace:
+    """
+    Compact JSONL trace of the nodes an A* search expands.
+
+    The first line is a header with the maze grid, every later line one
+    expanded node: its id, its parent's id, f, g, h, the action that led to
+    it and its compact state, so any node can be rendered without replaying
+    the search. Only every `sample_every`-th expansion is written, the goal
+    always is. Lines are formatted and written by a background thread
+    through a buffered file, so the search itself only queues tuples. If the
+    writer fails, say on a full disk, its error is raised by the next record
+    queued and again when the trace is closed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        maze: Maze,
+        sample_every: int = 1,
+        buffer_size: int = 1 << 20,
+    ):
+        self.sample_every = sample_every
+        self.parents: dict = {}  # frontier key of a queued node -> parent's id
+        self.file = open(path, "w", encoding="utf-8", buffering=buffer_size)
+        self.file.write(
+            json.dumps(
+                {
+                    "map": [" ".join(row) for row in maze.map],
+                    "agent": maze.agent,
+                    "sample_every": sample_every,
+                }
+            )
+            + "\n"
+        )
+        self.records: Queue = Queue(maxsize=1 << 16)
+        self.error: Exception | None = None  # What stopped the writer, if anything
+        self.writer = Thread(target=self.write_records, daemon=True)
+        self.writer.start()
+
+    def write_records(self) -> None:
+        try:
+            while (record := self.records.get()) is not None:
+                node_id, parent_id, f, g, h, action, colored, agent = record
+                self.file.write(
+                    f'{{"id":{node_id},"parent":{json.dumps(parent_id)},'
+                    f'"f":{f},"g":{g},"h":{h},"action":{json.dumps(action)},'
+                    f'"colored":"{colored:x}","agent":{agent}}}\n'
+                )
+        except Exception as error:
+            self.error = error
+
+    def put(self, record: tuple | None) -> None:
+        """Queue `record` for the writer, raising its error if it has stopped."""
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self.records.put(record, timeout=0.1)
+                return
+            except Full:  # The writer is behind, or it has died with the queue full
+                continue
+
+    def add_child(self, parent_id: int, key) -> None:
+        """
+        Remember the parent of the node just queued under `key`.
+
+        Only call this for nodes the frontier accepted. A node that replaces a
+        worse entry for the same key overwrites that entry's parent, so the
+        map never holds more entries than the frontier.
+        """
+        self.parents[key] = parent_id
+
+    def expand(self, node, node_id: int, goal: bool = False) -> None:
+        """Record `node`, popped from the frontier, if it is sampled."""
+        parent_id = self.parents.pop(node.state, None)
+        if goal or node_id % self.sample_every == 0:
+            state = node.state
+            self.put(
+                (
+                    node_id,
+                    parent_id,
+                    node.cost,
+                    state.cost,
+                    node.cost - state.cost if parent_id is not None else 0,
+                    str(node.direction) if node.direction else None,
+                    state.colored,
+                    state.agent,
+                )
+            )
+
+    def skip(self, node) -> None:
+        """Forget `node`, popped from the frontier but not expanded."""
+        self.parents.pop(node.state, None)
+
+    def close(self) -> None:
+        """Write the queued records and close the file, raising any writer error."""
+        try:
+            self.put(None)
+            self.writer.join()
+        finally:
+            self.file.close()
+        if self.error is not None:  # Died with room left in the queue
+            raise self.error
+
+    def __enter__(self) -> "SearchTrace":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_trace(path: str) -> tuple[Layout, dict[int, dict]]:
+    """
+    Load a trace file as its layout and its records by node id.
+
+    Raises ValueError if the file is not a trace or has no node records.
+    """
+    with open(path, encoding="utf-8") as file:
+        try:
+            header = json.loads(file.readline())
+            layout = Layout([row.split(" ") for row in header["map"]])
+            records = {}
+            for line in file:
+                record = json.loads(line)
+                records[record["id"]] = record
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"Empty or malformed trace '{path}'.") from error
+    if not records:
+        raise ValueError(f"Empty or malformed trace '{path}': it has no nodes.")
+    return layout, records
+
+
+def state_of(layout: Layout, record: dict) -> MazeState:
+    """Rebuild the compact state of a traced node."""
+    colored = int(record["colored"], 16)
+    colored_cells = colored.bit_count()
+    return MazeState(
+        layout, colored, record["agent"], colored_cells, record["g"] - colored_cells + 1
+    )
@@ -0,0 +1,218 @@
+import argparse
+import hashlib
+import json
+import os
+from copy import deepcopy
+from pathlib import Path
+
+from batch import SEARCHES
+from heuristic import HEURISTICS
+from maze import Direction, Maze
+from search import Successor
+
+CACHE_VERSION = 1  # Bump when the entry layout changes, older entries are dropped
+COUNTERS = ("searches_done", "max_frontier_size", "final_frontier_size")
+
+
+def maze_digest(maze: Maze) -> str:
+    """Content hash of a maze as loaded, so reformatting the file keeps the key."""
+    content = "\n".join(" ".join(row) for row in maze.map)
+    return hashlib.sha256(f"{content}\n{maze.agent_pos}".encode()).hexdigest()
+
+
+class SolutionCache:
+    """
+    On-disk cache of solved mazes, one small JSON file per entry.
+
+    Entries are keyed by the content hash of the maze, the heuristic name and
+    the search variant, and hold the actions, the cost and the search
+    counters. Every hit is checked by replaying the actions through
+    `Maze.take_action`; an entry that does not reach the goal at the stored
+    cost is deleted and counts as a miss. Hits refresh the file's modification
+    time, and the least recently used entries are evicted once the directory
+    holds more than `max_bytes`.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def key(self, maze: Maze, heuristic: str, search: str) -> str:
+        """Key of a search on `maze`, to be taken before the search runs."""
+        return hashlib.sha256(
+            f"{maze_digest(maze)}/{heuristic}/{search}".encode()
+        ).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, maze: Maze) -> tuple | None:
+        """
+        Verified cached result for `key`, shaped like the result of a search.
+
+        `maze` is the unsolved maze the key was taken from; it is copied, not
+        changed. The successor's maze holds the replayed actions, so it can be
+        analysed and undone like one returned by a search.
+        """
+        path = self.path(key)
+        try:
+            with path.open(encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            path.unlink(missing_ok=True)
+            return None
+        replayed = deepcopy(maze)
+        try:  # Entries missing a field or holding the wrong types are invalid too
+            h = HEURISTICS[entry["heuristic"]]
+            counters = tuple(entry[name] for name in COUNTERS)
+            valid = (
+                all(
+                    replayed.take_action(Direction[action])
+                    for action in entry["actions"]
+                )
+                and replayed.goal_reached
+                and replayed.cost == entry["cost"]
+            )
+        except (KeyError, TypeError):
+            valid = False
+        if not valid:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # Mark as recently used for eviction
+        return (Successor(replayed, None, h), *counters)
+
+    def put(
+        self, key: str, maze: Maze, heuristic: str, search: str, result: tuple
+    ) -> None:
+        """Store the result of a search on `maze` under `key`, then evict."""
+        successor, searches_done, max_frontier_size, final_frontier_size = result
+        entry = {
+            "version": CACHE_VERSION,
+            "maze": maze_digest(maze),
+            "heuristic": heuristic,
+            "search": search,
+            "actions": [action.name for action in successor.maze.actions],
+            "cost": successor.maze.cost,
+            "searches_done": searches_done,
+            "max_frontier_size": max_frontier_size,
+            "final_frontier_size": final_frontier_size,
+        }
+        path = self.path(key)
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        with partial.open("w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        partial.replace(path)  # Readers never see a half written entry
+        self.evict()
+
+    def entries(self) -> list[tuple[Path, os.stat_result]]:
+        """Entry files with their stats, least recently used first."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:  # Removed by another process meanwhile
+                continue
+        return sorted(entries, key=lambda entry: entry[1].st_mtime)
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the size limit holds."""
+        entries = self.entries()
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def matching(
+        self,
+        maze: Maze | None = None,
+        heuristic: str | None = None,
+        search: str | None = None,
+    ) -> list[tuple[Path, os.stat_result, dict]]:
+        """Entries matching every given filter, all of them if none."""
+        digest = maze_digest(maze) if maze is not None else None
+        matches = []
+        for path, stat in self.entries():
+            try:
+                with path.open(encoding="utf-8") as file:
+                    entry = json.load(file)
+            except (OSError, ValueError):
+                entry = {}  # Unreadable entries match any filter
+            if (
+                (digest is None or entry.get("maze") == digest)
+                and (heuristic is None or entry.get("heuristic") == heuristic)
+                and (search is None or entry.get("search") == search)
+            ):
+                matches.append((path, stat, entry))
+        return matches
+
+    def invalidate(
+        self,
+        maze: Maze | None = None,
+        heuristic: str | None = None,
+        search: str | None = None,
+    ) -> int:
+        """Remove the entries matching every given filter, all of them if none."""
+        matches = self.matching(maze, heuristic, search)
+        for path, _, _ in matches:
+            path.unlink(missing_ok=True)
+        return len(matches)
+
+    def solve(
+        self, maze: Maze, heuristic: str, search: str = "compact"
+    ) -> tuple[tuple, bool]:
+        """
+        Result of a batch search variant on `maze`, from the cache when possible.
+
+        Returns the search result and whether it was a cache hit.
+        """
+        key = self.key(maze, heuristic, search)
+        result = self.get(key, maze)
+        if result is not None:
+            return result, True
+        result = SEARCHES[search](maze, HEURISTICS[heuristic])
+        self.put(key, maze, heuristic, search, result)
+        return result, False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="List or invalidate the entries of a solution cache."
+    )
+    parser.add_argument("directory", help="Cache directory")
+    parser.add_argument(
+        "-m", "--maze", help="Only entries for this level number or maze file"
+    )
+    parser.add_argument("-H", "--heuristic", help="Only entries for this heuristic")
+    parser.add_argument("-s", "--search", help="Only entries for this search variant")
+    parser.add_argument(
+        "--invalidate",
+        action="store_true",
+        help="Remove the matching entries instead of listing them",
+    )
+    args = parser.parse_args()
+
+    cache = SolutionCache(args.directory)
+    maze = None
+    if args.maze:
+        maze = Maze(int(args.maze) if args.maze.isdigit() else args.maze)
+    if args.invalidate:
+        removed = cache.invalidate(maze, args.heuristic, args.search)
+        print(f"Removed {removed} entries")
+    else:
+        total = 0
+        for _, stat, entry in cache.matching(maze, args.heuristic, args.search):
+            total += stat.st_size
+            print(
+                f"{entry.get('maze', '?')[:12]}  {entry.get('heuristic', '?'):<18}"
+                f"{entry.get('search', '?'):<10}cost {entry.get('cost', '?'):<6}"
+                f"{entry.get('searches_done', '?')} searches"
+            )
+        print(f"{total / 1024:.1f} KB in matching entries")
@@ -0,0 +1,51 @@
+import unittest
+
+from batch import FIELDS, parse_heuristics, parse_levels, run_batch
+from heuristic import HEURISTICS
+
+
+class TestParsing(unittest.TestCase):
+    def test_levels(self):
+        self.assertEqual(parse_levels("1-3,7,11-12"), [1, 2, 3, 7, 11, 12])
+        for spec in ("0", "14-16"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_levels(spec)
+
+    def test_heuristics(self):
+        self.assertEqual(parse_heuristics("all"), list(HEURISTICS))
+        self.assertEqual(parse_heuristics("monotonic"), ["monotonic"])
+        with self.assertRaises(ValueError):
+            parse_heuristics("monotonic,unknown")
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_records(self):
+        jobs = [
+            (1, "nearest_uncolored", "compact"),
+            (3, "nearest_uncolored", "macro"),
+            ("missing.txt", "nearest_uncolored", "compact"),
+        ]
+        records = {record["level"]: record for record in run_batch(jobs, workers=2)}
+        self.assertEqual(set(records), {1, 3, "missing.txt"})
+        for record in records.values():
+            self.assertEqual(list(record), FIELDS)
+        self.assertEqual(records[1]["status"], "solved")
+        self.assertEqual(records[1]["cost"], 35)
+        self.assertEqual(records[3]["search"], "macro")
+        self.assertEqual(records[3]["cost"], 43)
+        # A failing job is reported, not raised, and the others still run
+        self.assertEqual(records["missing.txt"]["status"], "error")
+        self.assertIn("FileNotFoundError", records["missing.txt"]["error"])
+
+    def test_timeout(self):
+        jobs = [(15, "nearest_uncolored", "full"), (1, "monotonic", "compact")]
+        records = list(run_batch(jobs, workers=2, timeout=0.5))
+        statuses = {record["level"]: record["status"] for record in records}
+        self.assertEqual(statuses, {15: "timeout", 1: "solved"})
+        self.assertIsNone(records[-1]["cost"])
+
+    def test_memory_limit(self):
+        jobs = [(15, "nearest_uncolored", "full")]
+        (record,) = run_batch(jobs, workers=1, memory_limit=20)
+        self.assertEqual(record["status"], "memory")
+        self.assertIsNone(record["cost"])
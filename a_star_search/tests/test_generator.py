@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from generator import generate_maze, write_maze
+from heuristic import nearest_uncolored_heuristic
+from maze import Maze
+from search import a_star_search
+
+
+class TestGenerateMaze(unittest.TestCase):
+    def test_generated_mazes_are_solvable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for rows, cols, density in [(4, 4, 0.25), (7, 9, 0.25), (10, 10, 0.4)]:
+                for seed in range(5):
+                    with self.subTest(rows=rows, cols=cols, seed=seed):
+                        grid = generate_maze(rows, cols, density, seed)
+                        self.assertEqual((len(grid), len(grid[0])), (rows, cols))
+                        border = grid[0] + grid[-1] + [row[0] for row in grid]
+                        self.assertEqual(set(border + [row[-1] for row in grid]), {"X"})
+                        self.assertEqual(sum(row.count("S") for row in grid), 1)
+                        self.assertGreater(sum(row.count("0") for row in grid), 0)
+                        path = Path(directory) / f"maze_{rows}_{cols}_{seed}.txt"
+                        write_maze(grid, path)
+                        successor = a_star_search(
+                            Maze(str(path)), nearest_uncolored_heuristic, compact=True
+                        )[0]
+                        self.assertTrue(successor.maze.goal_reached)
+
+    def test_seed_makes_the_maze(self):
+        self.assertEqual(generate_maze(9, 9, seed=7), generate_maze(9, 9, seed=7))
+
+    def test_invalid_arguments(self):
+        invalid = [(3, 3, 0.25), (4, 3, 0.25), (9, 9, -0.1), (9, 9, 1)]
+        for rows, cols, density in invalid:
+            with self.subTest(rows=rows, cols=cols, density=density):
+                with self.assertRaises(ValueError):
+                    generate_maze(rows, cols, density, seed=1)
+        with self.assertRaisesRegex(ValueError, "in 5 attempts"):
+            generate_maze(4, 4, 0.99, seed=1, max_attempts=5)
@@ -0,0 +1,67 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from heuristic import HEURISTICS
+from heuristic_quality import analyze_heuristics, display_report
+from maze import Maze
+
+OPTIMAL_COSTS = {1: 35, 3: 43, 7: 66}
+UNSOLVABLE = "X X X X X\nX S 0 X X\nX X X 0 X\nX X X X X\n"  # (2, 3) is out of reach
+
+
+class TestHeuristicQuality(unittest.TestCase):
+    def test_exact_costs_and_admissibility(self):
+        for level, cost in OPTIMAL_COSTS.items():
+            with self.subTest(level=level):
+                report = analyze_heuristics(Maze(level), list(HEURISTICS))
+                self.assertEqual(report["optimal_cost"], cost)
+                self.assertEqual(
+                    report["evaluated_states"],
+                    report["reachable_states"] - report["dead_ends"],
+                )
+                for name in ("monotonic", "nearest_uncolored"):  # Admissible
+                    result = report["heuristics"][name]
+                    self.assertEqual(result["violations"], 0)
+                    self.assertLessEqual(result["max_ratio"], 1)
+                inadmissible = report["heuristics"]["inadmissible"]
+                self.assertGreater(inadmissible["violations"], 0)
+                self.assertGreater(inadmissible["max_ratio"], 1)
+                for result in report["heuristics"].values():
+                    self.assertLessEqual(
+                        result["expected_expansions"],
+                        result["expansions_upper_bound"],
+                    )
+
+    def test_sampling_workers_and_cache(self):
+        maze = Maze(3)
+        names = ["nearest_uncolored"]
+        report = analyze_heuristics(maze, names)
+        with tempfile.TemporaryDirectory() as directory:
+            parallel = analyze_heuristics(maze, names, workers=2, cache_dir=directory)
+            self.assertEqual(len(list(Path(directory).glob("*.pickle"))), 1)
+            cached = analyze_heuristics(maze, names, cache_dir=directory)
+        for other in (parallel, cached):
+            # Batches depend on the workers, so the ratios are summed in another order
+            result = dict(other["heuristics"]["nearest_uncolored"])
+            expected = dict(report["heuristics"]["nearest_uncolored"])
+            self.assertAlmostEqual(result.pop("mean_ratio"), expected.pop("mean_ratio"))
+            self.assertEqual(result, expected)
+        sampled = analyze_heuristics(maze, names, sample=20, seed=1)
+        self.assertEqual(sampled["evaluated_states"], 20)
+        self.assertEqual(sampled["reachable_states"], report["reachable_states"])
+
+    def test_unsolvable_maze(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "unsolvable.txt"
+            path.write_text(UNSOLVABLE, encoding="utf-8")
+            report = analyze_heuristics(Maze(str(path)), list(HEURISTICS))
+        self.assertEqual(report["evaluated_states"], 0)
+        self.assertEqual(report["dead_ends"], report["reachable_states"])
+        self.assertEqual(report["heuristics"], {})
+        output = io.StringIO()
+        with redirect_stdout(output):
+            display_report(report)
+        self.assertIn("there is nothing to measure", output.getvalue())
@@ -0,0 +1,76 @@
+import tracemalloc
+import unittest
+from sys import getsizeof
+
+from heuristic import nearest_uncolored_heuristic
+from maze import Maze
+from memory_stats import MemoryStats, container_size
+from search import Frontier, a_star_search
+
+STRUCTURES = ["frontier", "visited set", "search nodes", "maze states"]
+
+
+def recorded_search(level: int, compact: bool, **options) -> MemoryStats:
+    memory = MemoryStats(**options)
+    a_star_search(
+        Maze(level), nearest_uncolored_heuristic, compact=compact, memory=memory
+    )
+    return memory
+
+
+class TestMemoryStats(unittest.TestCase):
+    def test_peak_and_breakdown(self):
+        memory = recorded_search(3, compact=True)
+        self.assertFalse(memory.active)
+        self.assertFalse(tracemalloc.is_tracing())  # Stopped by the recording
+        self.assertGreater(memory.peak, 0)
+        self.assertGreater(memory.peak_rss, memory.peak)
+        self.assertEqual(list(memory.breakdown), STRUCTURES)
+        self.assertTrue(all(size > 0 for size in memory.breakdown.values()))
+        self.assertGreater(memory.breakdown_items, 0)
+
+    def test_full_copies_take_more_than_compact_states(self):
+        compact = recorded_search(3, compact=True)
+        full = recorded_search(3, compact=False)
+        self.assertGreater(
+            full.breakdown["maze states"], 2 * compact.breakdown["maze states"]
+        )
+        self.assertGreater(full.peak, compact.peak)
+
+    def test_without_allocation_tracing(self):
+        memory = recorded_search(3, compact=True, trace_allocations=False)
+        self.assertEqual(memory.peak, 0)
+        self.assertGreater(memory.peak_rss, 0)
+        self.assertEqual(list(memory.breakdown), STRUCTURES)
+
+    def test_tracing_started_by_the_caller_is_kept(self):
+        tracemalloc.start()
+        try:
+            memory = recorded_search(3, compact=True)
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(memory.peak, 0)
+
+    def test_samples_only_after_growth(self):
+        memory = MemoryStats(growth=2)
+        frontier = Frontier()
+        for key in range(10):
+            frontier.add_or_update(f"node {key}", key, key=key)
+        memory.sample(frontier, {})
+        self.assertEqual(memory.breakdown_items, 10)
+        self.assertEqual(memory.next_sample, 20)
+        for key in range(10, 15):
+            frontier.add_or_update(f"node {key}", key, key=key)
+        memory.sample(frontier, {})
+        self.assertEqual(memory.breakdown_items, 10)  # Skipped, not grown enough
+        memory.sample(frontier, {}, force=True)
+        self.assertEqual(memory.breakdown_items, 15)
+
+    def test_shared_containers_are_counted_once(self):
+        shared = [1000, 2000]
+        leaves: list = []
+        size = container_size([shared, shared, object()], set(), leaves)
+        expected = getsizeof([None] * 3) + getsizeof(shared) + 2 * getsizeof(1000)
+        self.assertEqual(size, expected)
+        self.assertEqual(len(leaves), 1)  # Handed back to be accounted on its own
@@ -0,0 +1,119 @@
+import unittest
+
+from anytime_search import ara_star_search
+from bounded_search import ida_star_search, sma_star_search
+from heuristic import nearest_uncolored_heuristic
+from macro_search import macro_a_star_search
+from maze import Maze
+from parallel_search import hda_star_search
+from search import (
+    FRONTIERS,
+    Frontier,
+    IndexedHeapFrontier,
+    a_star_search,
+    in_place_a_star_search,
+)
+
+# Optimal costs of the easy and normal levels that solve in well under a second
+OPTIMAL_COSTS = {1: 35, 2: 29, 3: 43, 4: 54, 5: 70, 7: 66, 8: 54, 10: 61}
+
+
+def solved_cost(result) -> int:
+    maze = result[0].maze
+    assert maze.goal_reached, "The returned maze is not solved"
+    return maze.cost
+
+
+class TestOptimalCosts(unittest.TestCase):
+    def assert_optimal(self, search, **options):
+        for level, cost in OPTIMAL_COSTS.items():
+            with self.subTest(level=level, **options):
+                result = search(Maze(level), nearest_uncolored_heuristic, **options)
+                self.assertEqual(solved_cost(result), cost)
+
+    def test_a_star(self):
+        self.assert_optimal(a_star_search)  # Full maze copies, the slowest by far
+        for frontier in FRONTIERS:
+            self.assert_optimal(a_star_search, compact=True, frontier=frontier)
+
+    def test_in_place(self):
+        for frontier in FRONTIERS:
+            self.assert_optimal(in_place_a_star_search, frontier=frontier)
+
+    def test_bounded_memory(self):
+        self.assert_optimal(ida_star_search)
+        self.assert_optimal(sma_star_search)
+        self.assert_optimal(sma_star_search, max_nodes=500)
+
+    def test_hda_star(self):
+        self.assert_optimal(hda_star_search, workers=2)
+
+    def test_ara_star(self):
+        for level, cost in OPTIMAL_COSTS.items():
+            with self.subTest(level=level):
+                maze = Maze(level)
+                solutions = list(ara_star_search(maze, nearest_uncolored_heuristic))
+                costs = [solved_cost(solution) for solution in solutions]
+                self.assertEqual(costs[-1], cost)
+                self.assertEqual(solutions[-1][-1], 1.0)
+                self.assertEqual(costs, sorted(costs, reverse=True))
+
+    def test_pruning(self):
+        for frontier in FRONTIERS:
+            self.assert_optimal(
+                a_star_search, compact=True, frontier=frontier, prune=True
+            )
+
+    def test_macro(self):
+        for frontier in FRONTIERS:
+            self.assert_optimal(macro_a_star_search, frontier=frontier)
+
+    def test_dominance(self):
+        for frontier in FRONTIERS:
+            self.assert_optimal(
+                a_star_search, compact=True, frontier=frontier, dominance=True
+            )
+        self.assert_optimal(a_star_search, prune=True, dominance=True)
+
+
+def sizes(frontier: Frontier) -> tuple[int, int, int]:
+    """Live entries, entries in the heap and tombstones among them."""
+    return len(frontier), len(frontier.elements), frontier.stale
+
+
+class TestFrontiers(unittest.TestCase):
+    def test_tombstones_are_compacted(self):
+        frontier = Frontier()
+        for key in range(4):
+            self.assertTrue(frontier.add_or_update(f"node {key}", 10, key=key))
+        self.assertFalse(frontier.add_or_update("worse 0", 11, key=0))
+        self.assertTrue(frontier.add_or_update("better 0", 9, key=0))
+        self.assertTrue(frontier.add_or_update("better 1", 8, key=1))
+        self.assertEqual(sizes(frontier), (4, 6, 2))
+        self.assertTrue(frontier.add_or_update("better 2", 7, key=2))
+        self.assertEqual(sizes(frontier), (4, 7, 3))
+        # The fourth tombstone outnumbers the three other live entries
+        self.assertTrue(frontier.add_or_update("better 3", 6, key=3))
+        self.assertEqual(sizes(frontier), (4, 4, 0))
+        popped = [frontier.pop() for _ in range(len(frontier))]
+        self.assertEqual(popped, ["better 3", "better 2", "better 1", "better 0"])
+        self.assertEqual(frontier.stale_pops, 0)
+        self.assertTrue(frontier.is_empty())
+
+    def test_decrease_key_in_place(self):
+        frontier = IndexedHeapFrontier()
+        for key, priority in enumerate([5, 6, 7, 8, 9]):
+            frontier.add_or_update(f"node {key}", priority, key=key)
+        self.assertFalse(frontier.add_or_update("worse 4", 10, key=4))
+        self.assertTrue(frontier.add_or_update("better 4", 1, key=4))
+        self.assertEqual(len(frontier.elements), 5)  # Updated, not pushed again
+        self.assertEqual(frontier.elements[0][-1], "better 4")
+        for index, entry in enumerate(frontier.elements):
+            self.assertEqual(frontier.position[entry[3]], index)
+        # Equal priority: the higher g wins the tie
+        self.assertTrue(frontier.add_or_update("deeper 3", 5, g=2, key=3))
+        popped = [frontier.pop() for _ in range(len(frontier))]
+        self.assertEqual(
+            popped, ["better 4", "deeper 3", "node 0", "node 1", "node 2"]
+        )
+        self.assertTrue(frontier.is_empty())
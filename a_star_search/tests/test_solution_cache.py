@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+
+from maze import Maze
+from solution_cache import CACHE_VERSION, SolutionCache
+
+HEURISTIC = "nearest_uncolored"
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = SolutionCache(directory.name)
+
+    def cached_entry(self, level: int) -> tuple[Maze, str]:
+        """Solve `level` into the cache and return its maze and key."""
+        maze = Maze(level)
+        self.cache.solve(maze, HEURISTIC)
+        return maze, self.cache.key(maze, HEURISTIC, "compact")
+
+    def rewrite(self, key: str, change) -> None:
+        path = self.cache.path(key)
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        path.write_text(json.dumps(change(entry)), encoding="utf-8")
+
+    def test_hit_replays_the_solution(self):
+        maze = Maze(3)
+        result, hit = self.cache.solve(maze, HEURISTIC)
+        self.assertFalse(hit)
+        cached, hit = self.cache.solve(maze, HEURISTIC)
+        self.assertTrue(hit)
+        self.assertTrue(cached[0].maze.goal_reached)
+        self.assertEqual(cached[0].maze.cost, 43)
+        self.assertEqual(cached[0].maze.actions, result[0].maze.actions)
+        self.assertEqual(cached[1:], result[1:])
+        self.assertFalse(maze.goal_reached)  # Replayed on a copy
+        # Other searches and heuristics are keyed apart
+        self.assertFalse(self.cache.solve(maze, HEURISTIC, "in-place")[1])
+        self.assertFalse(self.cache.solve(maze, "monotonic")[1])
+
+    def test_invalid_entries_are_dropped(self):
+        changes = {
+            "shortened": lambda entry: {**entry, "actions": entry["actions"][:-1]},
+            "wrong cost": lambda entry: {**entry, "cost": entry["cost"] - 1},
+            "bad action": lambda entry: {**entry, "actions": ["SIDEWAYS"]},
+            "old version": lambda entry: {**entry, "version": CACHE_VERSION - 1},
+            "not an object": lambda entry: [entry],
+        }
+        for field in ("cost", "heuristic", "searches_done", "actions"):
+            changes[f"no {field}"] = lambda entry, field=field: {
+                name: value for name, value in entry.items() if name != field
+            }
+        for name, change in changes.items():
+            with self.subTest(name):
+                maze, key = self.cached_entry(1)
+                self.rewrite(key, change)
+                self.assertIsNone(self.cache.get(key, maze))
+                self.assertFalse(self.cache.path(key).exists())
+                self.assertFalse(self.cache.solve(maze, HEURISTIC)[1])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        entries = [self.cached_entry(level) for level in (1, 2, 3)]
+        paths = [self.cache.path(key) for _, key in entries]
+        for age, path in enumerate(reversed(paths), start=1):
+            os.utime(path, (1_000_000 - age, 1_000_000 - age))  # Level 1 oldest
+        maze, key = entries[0]
+        self.assertIsNotNone(self.cache.get(key, maze))  # Now the most recent
+        sizes = [path.stat().st_size for path in paths]
+        self.cache.max_bytes = sizes[0] + sizes[2]
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertEqual([path.exists() for path in paths], [True, False, True])
+
+    def test_invalidate_by_filter(self):
+        self.cached_entry(1)
+        maze, _ = self.cached_entry(2)
+        self.cache.solve(maze, "monotonic")
+        self.assertEqual(len(self.cache.matching(maze)), 2)
+        self.assertEqual(self.cache.invalidate(maze, heuristic="monotonic"), 1)
+        self.assertEqual(self.cache.invalidate(), 2)
+        self.assertEqual(self.cache.entries(), [])
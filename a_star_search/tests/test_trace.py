@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from heuristic import nearest_uncolored_heuristic
+from maze import Maze
+from search import a_star_search
+from search_trace import SearchTrace, read_trace, state_of
+
+
+class TestSearchTrace(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / "trace.jsonl")
+
+    def trace_search(self, level: int, sample_every: int = 1):
+        maze = Maze(level)
+        with SearchTrace(self.path, maze, sample_every) as trace:
+            return a_star_search(
+                maze, nearest_uncolored_heuristic, compact=True, trace=trace
+            )
+
+    def test_goal_path_is_traced(self):
+        successor, searches_done, _, _ = self.trace_search(3)
+        layout, records = read_trace(self.path)
+        self.assertEqual(sorted(records), list(range(searches_done + 1)))
+        goal = records[searches_done]
+        self.assertEqual(goal["g"], successor.maze.cost)
+        self.assertEqual(state_of(layout, goal).cost, successor.maze.cost)
+        self.assertTrue(state_of(layout, goal).goal_reached)
+        chain = [goal]
+        while chain[-1]["parent"] is not None:
+            chain.append(records[chain[-1]["parent"]])
+        self.assertEqual(chain[-1]["id"], 0)
+        self.assertEqual(len(chain) - 1, len(successor.maze.actions))
+
+    def test_sampling_keeps_the_goal(self):
+        _, searches_done, _, _ = self.trace_search(3, sample_every=4)
+        _, records = read_trace(self.path)
+        self.assertEqual(sorted(records), [*range(0, searches_done, 4), searches_done])
+
+    def test_empty_or_malformed_trace(self):
+        header = {"map": ["X X X", "X S X", "X X X"], "agent": 4, "sample_every": 1}
+        for text in ("", json.dumps(header) + "\n", "[1]\n", "not json\n"):
+            Path(self.path).write_text(text, encoding="utf-8")
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, "Empty or malformed trace"):
+                    read_trace(self.path)
+        replay = subprocess.run(
+            [sys.executable, "replay.py", self.path], capture_output=True, text=True
+        )
+        self.assertEqual(replay.returncode, 2)
+        self.assertIn("Empty or malformed trace", replay.stderr)
+
+    @unittest.skipUnless(os.path.exists("/dev/full"), "needs /dev/full")
+    def test_writer_error_is_raised(self):
+        maze = Maze(10)
+        with self.assertRaises(OSError):
+            with SearchTrace("/dev/full", maze, buffer_size=4096) as trace:
+                a_star_search(
+                    maze, nearest_uncolored_heuristic, compact=True, trace=trace
+                )
@@ -0,0 +1,98 @@
+import argparse
+import multiprocessing
+from pathlib import Path
+from time import perf_counter
+
+from color import ENCODINGS, ColoringSolver, Graph, dsatur_coloring, greedy_clique
+from reader import GRAPH_DIR, read_graph_file
+
+
+def run_encoding(
+    graph: Graph,
+    palette: int,
+    encoding: str,
+    clique: list[int] | None,
+    pipe,
+) -> None:
+    """Encode once, then search top down with SAT alone, ignoring the clique bound."""
+    start = perf_counter()
+    with ColoringSolver(graph, palette, encoding, clique) as solver:
+        encoded = perf_counter()
+        pipe.send(
+            {
+                "variables": solver.variables,
+                "clauses": solver.clauses,
+                "encode": encoded - start,
+            }
+        )
+        best = palette
+        while best > 1 and solver.colorable(best - 1):
+            best = solver.colors_used()
+        pipe.send({"chromatic_number": best, "solve": perf_counter() - encoded})
+
+
+def benchmark_graph(graph_path: str, timeout: float) -> None:
+    graph = read_graph_file(graph_path)
+    clique = greedy_clique(graph)
+    palette = max(dsatur_coloring(graph).values())
+    edges = sum(len(neighbors) for neighbors in graph.values()) // 2
+    print(
+        f"\n{graph_path}: {len(graph)} vertices, {edges} edges, "
+        f"clique {len(clique)}, DSATUR {palette}"
+    )
+    print(
+        f"{'Encoding':<12}{'Symmetry':>9}{'Variables':>11}{'Clauses':>10}"
+        f"{'Encode s':>10}{'Solve s':>10}{'Chromatic':>11}"
+    )
+    context = multiprocessing.get_context()
+    for encoding in ENCODINGS:
+        for symmetry in (False, True):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=run_encoding,
+                args=(graph, palette, encoding, clique if symmetry else None, sender),
+                daemon=True,
+            )
+            process.start()
+            sender.close()
+            record = {}
+            deadline = perf_counter() + timeout
+            while receiver.poll(max(0, deadline - perf_counter())):
+                try:
+                    record.update(receiver.recv())
+                except EOFError:
+                    break
+            process.kill()
+            process.join()
+            solve = f"{record['solve']:.3f}" if "solve" in record else "timeout"
+            print(
+                f"{encoding:<12}{'yes' if symmetry else 'no':>9}"
+                f"{record.get('variables', '-'):>11}{record.get('clauses', '-'):>10}"
+                f"{record.get('encode', float('nan')):>10.3f}{solve:>10}"
+                f"{record.get('chromatic_number', '-'):>11}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the CNF encodings of vertex coloring on graph files."
+    )
+    parser.add_argument(
+        "graphs",
+        nargs="*",
+        help="Graph files under the graphs directory, all of them if none are given",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=60,
+        help="Seconds each encoding gets to find the chromatic number",
+    )
+    args = parser.parse_args()
+
+    graphs = args.graphs or sorted(path.name for path in Path(GRAPH_DIR).glob("*.txt"))
+    print("Solve times are a top-down SAT search from the DSATUR bound down,")
+    print("with the clique only used for symmetry breaking, not as a bound.")
+    for graph_path in graphs:
+        benchmark_graph(graph_path, args.timeout)
@@ -1,71 +1,405 @@
+import heapq
+from collections.abc import Mapping, Sequence
+
 from pysat.solvers import Solver
 
 
-def vertex_k_coloring(graph: dict[int, list[int]], k: int) -> bool:
+ENCODINGS = ["pairwise", "sequential", "commander", "none"]
+
+Graph = Mapping[int, Sequence[int]]  # Such as a dict of lists, or a reader.CSRGraph
+
+
+class ColoringSolver:
+    """
+    One SAT encoding of a graph coloring, queried for any number of colors.
+
+    The graph is encoded once for a palette of `palette` colors, with a
+    selector literal per color that has to hold for the color to be used.
+    `colorable(k)` then assumes the selectors of the colors above k to be
+    false, so the solver keeps its encoding and every learnt clause from
+    one query to the next.
+
+    `encoding` picks how at most one color per vertex is enforced: pairwise
+    clauses, a sequential counter, a commander encoding, or not at all, as a
+    vertex with several colors can keep any one of them. Given a `clique`,
+    its vertices are pinned to the first colors and every other vertex may
+    only use a color one above those of the vertices before it, which rules
+    out the equivalent colorings that only permute colors.
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        palette: int,
+        encoding: str = "pairwise",
+        clique: list[int] | None = None,
+    ):
+        if encoding not in ENCODINGS:
+            raise ValueError(
+                f"Unknown encoding '{encoding}', "
+                f"expected one of: {', '.join(ENCODINGS)}."
+            )
+        self.graph = graph
+        self.palette = palette
+        self.solver = Solver()
+        self.variables = len(graph) * palette + palette  # Auxiliaries come after
+        self.clauses = 0
+        n = len(graph)  # Number of vertices
+        k = palette
+
+        # Condition (i): Every vertex must have at least one color
+        for v in range(n):
+            self.add_clause([self.var(v, c) for c in range(1, k + 1)])
+
+        # Condition (ii): No vertex can have more than one color
+        for v in range(n):
+            colors = [self.var(v, c) for c in range(1, k + 1)]
+            if encoding == "pairwise":
+                self.at_most_one_pairwise(colors)
+            elif encoding == "sequential":
+                self.at_most_one_sequential(colors)
+            elif encoding == "commander":
+                self.at_most_one_commander(colors)
+
+        # Condition (iii): Adjacent vertices cannot have the same color
+        for v in range(n):
+            for u in graph[v]:
+                if u > v:  # To avoid adding the same clause twice
+                    for c in range(1, k + 1):
+                        self.add_clause([-self.var(v, c), -self.var(u, c)])
+
+        # A color can only be used while its selector holds
+        for v in range(n):
+            for c in range(1, k + 1):
+                self.add_clause([-self.var(v, c), self.selector(c)])
+
+        if clique:
+            self.break_symmetry(clique)
+
+    def add_clause(self, clause: list[int]) -> None:
+        self.solver.add_clause(clause)
+        self.clauses += 1
+
+    def new_var(self) -> int:
+        self.variables += 1
+        return self.variables
+
+    def at_most_one_pairwise(self, literals: list[int]) -> None:
+        for i, a in enumerate(literals):
+            for b in literals[i + 1 :]:
+                self.add_clause([-a, -b])
+
+    def at_most_one_sequential(self, literals: list[int]) -> None:
+        """Sinz's sequential counter, s_i is true once a literal up to i is."""
+        if len(literals) < 2:
+            return
+        previous = self.new_var()
+        self.add_clause([-literals[0], previous])
+        for literal in literals[1:-1]:
+            current = self.new_var()
+            self.add_clause([-literal, current])
+            self.add_clause([-previous, current])
+            self.add_clause([-literal, -previous])
+            previous = current
+        self.add_clause([-literals[-1], -previous])
+
+    def at_most_one_commander(self, literals: list[int], group_size: int = 3) -> None:
+        """
+        Klieber and Kwon's commander encoding over groups of `group_size`.
+
+        Each group is pairwise at most one and implies its commander, and the
+        commanders are encoded the same way until few enough are left.
+        """
+        if len(literals) <= group_size + 1:
+            self.at_most_one_pairwise(literals)
+            return
+        commanders = []
+        for start in range(0, len(literals), group_size):
+            group = literals[start : start + group_size]
+            self.at_most_one_pairwise(group)
+            commander = self.new_var()
+            for literal in group:
+                self.add_clause([-literal, commander])
+            commanders.append(commander)
+        self.at_most_one_commander(commanders, group_size)
+
+    def break_symmetry(self, clique: list[int]) -> None:
+        """
+        Pin `clique` to the first colors and bound the colors of the rest.
+
+        Renumbering the other colors by their first vertex, in vertex order,
+        turns any coloring into one where the i-th other vertex uses at most
+        color len(clique) + i, so no coloring is lost.
+        """
+        if len(clique) > self.palette:
+            self.add_clause([])  # More colors are needed than the palette has
+            return
+        for c, v in enumerate(clique, 1):
+            self.add_clause([self.var(v, c)])
+        pinned = set(clique)
+        others = (v for v in range(len(self.graph)) if v not in pinned)
+        for i, v in enumerate(others, 1):
+            for c in range(len(clique) + i + 1, self.palette + 1):
+                self.add_clause([-self.var(v, c)])
+
+    def var(self, v: int, c: int) -> int:
+        """Variable that is true when vertex v gets color c (1-based)."""
+        return v * self.palette + c
+
+    def selector(self, c: int) -> int:
+        """Variable that has to be true for color c to be used."""
+        return len(self.graph) * self.palette + c
+
+    def colorable(self, k: int) -> bool:
+        """
+        Determines if the graph can be colored using at most k colors.
+
+        Args:
+            k (int): The maximum number of colors that can be used, at most the palette.
+
+        Returns:
+            bool: True if the graph can be colored using at most k colors, False otherwise.
+        """
+        if k > self.palette:
+            raise ValueError(
+                f"Cannot ask for {k} colors from a palette of {self.palette}."
+            )
+        disabled = [-self.selector(c) for c in range(k + 1, self.palette + 1)]
+        return self.solver.solve(assumptions=disabled)
+
+    def coloring(self) -> dict[int, int]:
+        """Color (1-based) of every vertex in the last satisfying model."""
+        model = self.solver.get_model()
+        colors = range(1, self.palette + 1)
+        return {
+            # Without at most one a vertex may hold several, it keeps the lowest
+            v: next(c for c in colors if model[self.var(v, c) - 1] > 0)
+            for v in range(len(self.graph))
+        }
+
+    def colors_used(self) -> int:
+        """Number of distinct colors in the coloring found by the last query."""
+        return len(set(self.coloring().values()))
+
+    def close(self) -> None:
+        self.solver.delete()
+
+    def __enter__(self) -> "ColoringSolver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def dsatur_coloring(graph: Graph) -> dict[int, int]:
+    """
+    Colors the graph with DSATUR, giving an upper bound on the chromatic number.
+
+    The next vertex is always the one with the most distinct colors among its
+    neighbors, ties broken by degree, and it gets the smallest free color.
+
+    Args:
+        graph (Graph): A mapping representing the graph, where the keys are the vertices and the values are sequences of adjacent vertices.
+
+    Returns:
+        dict[int, int]: A color (1-based) for every vertex, no two adjacent vertices sharing one.
+    """
+    coloring = {}
+    saturation = {v: set() for v in graph}  # Colors seen among the neighbors
+    queue = [(0, -len(graph[v]), v) for v in graph]
+    heapq.heapify(queue)
+    while queue:
+        _, _, v = heapq.heappop(queue)
+        if v in coloring:
+            continue  # Stale entry, pushed again with a higher saturation
+        taken = saturation[v]
+        coloring[v] = next(c for c in range(1, len(taken) + 2) if c not in taken)
+        for u in graph[v]:
+            if u not in coloring and coloring[v] not in saturation[u]:
+                saturation[u].add(coloring[v])
+                heapq.heappush(queue, (-len(saturation[u]), -len(graph[u]), u))
+    return coloring
+
+
+def greedy_clique(graph: Graph) -> list[int]:
+    """
+    Finds a large clique greedily, giving a lower bound on the chromatic number.
+
+    A clique is grown from every vertex that could still beat the best one
+    found, always adding the candidate of highest degree.
+
+    Args:
+        graph (Graph): A mapping representing the graph, where the keys are the vertices and the values are sequences of adjacent vertices.
+
+    Returns:
+        list[int]: The vertices of the clique.
+    """
+    neighbors = {v: set(adjacent) for v, adjacent in graph.items()}
+    best: list[int] = []
+    for v in sorted(graph, key=lambda v: len(graph[v]), reverse=True):
+        if len(graph[v]) + 1 <= len(best):
+            break  # No later vertex has enough neighbors either
+        clique = [v]
+        candidates = neighbors[v]
+        while candidates:
+            u = max(candidates, key=lambda u: len(graph[u]))
+            clique.append(u)
+            candidates = candidates & neighbors[u]
+        if len(clique) > len(best):
+            best = clique
+    return best
+
+
+def is_valid_coloring(
+    graph: Graph, coloring: dict[int, int], k: int
+) -> bool:
+    """
+    Checks a coloring against the graph in O(V + E).
+
+    Args:
+        graph (Graph): A mapping representing the graph, where the keys are the vertices and the values are sequences of adjacent vertices.
+        coloring (dict[int, int]): A color for every vertex.
+        k (int): The maximum number of colors that can be used.
+
+    Returns:
+        bool: True if every vertex has a color between 1 and k and no two adjacent vertices share one.
+    """
+    if coloring.keys() != graph.keys():
+        return False
+    if any(c < 1 or c > k for c in coloring.values()):
+        return False
+    return all(coloring[v] != coloring[u] for v in graph for u in graph[v])
+
+
+def compact_colors(coloring: dict[int, int]) -> dict[int, int]:
+    """Renumbers the colors in use to 1, 2, ... keeping their order."""
+    renumbered = {c: i for i, c in enumerate(sorted(set(coloring.values())), 1)}
+    return {v: renumbered[c] for v, c in coloring.items()}
+
+
+def find_k_coloring(
+    graph: Graph,
+    k: int,
+    encoding: str = "pairwise",
+    symmetry: bool = True,
+) -> dict[int, int] | None:
+    """
+    Finds a coloring of the graph with at most k colors, if there is one.
+
+    A DSATUR coloring is tried first and returned when it fits in k colors,
+    and a greedy clique larger than k rules the graph out; the SAT solver
+    only runs when neither settles it. Every coloring is checked against the
+    graph before it is returned.
+
+    Args:
+        graph (Graph): A mapping representing the graph, where the keys are the vertices and the values are sequences of adjacent vertices.
+        k (int): The maximum number of colors that can be used.
+        encoding (str): How at most one color per vertex is encoded, one of ENCODINGS.
+        symmetry (bool): Whether to break color symmetries around a greedy clique.
+
+    Returns:
+        dict[int, int] | None: A color from 1 to k for every vertex, or None if the graph cannot be colored using at most k colors.
+    """
+    coloring = dsatur_coloring(graph)
+    if max(coloring.values(), default=0) > k:
+        clique = greedy_clique(graph)
+        if len(clique) > k:
+            return None
+        with ColoringSolver(graph, k, encoding, clique if symmetry else None) as solver:
+            if not solver.colorable(k):
+                return None
+            coloring = solver.coloring()
+    if not is_valid_coloring(graph, coloring, k):
+        raise RuntimeError(f"The {k}-coloring found does not fit the graph.")
+    return coloring
+
+
+def vertex_k_coloring(
+    graph: Graph,
+    k: int,
+    encoding: str = "pairwise",
+    symmetry: bool = True,
+) -> bool:
     """
     Determines if a given graph can be colored using at most k colors, such that no two adjacent vertices have the same color.
 
     Args:
-        graph (dict[int, list[int]]): A dictionary representing the graph, where the keys are the vertices and the values are lists of adjacent vertices.
+        graph (Graph): A mapping representing the graph, where the keys are the vertices and the values are sequences of adjacent vertices.
         k (int): The maximum number of colors that can be used.
+        encoding (str): How at most one color per vertex is encoded, one of ENCODINGS.
+        symmetry (bool): Whether to break color symmetries around a greedy clique.
 
     Returns:
         bool: True if the graph can be colored using at most k colors, False otherwise.
     """
+    return find_k_coloring(graph, k, encoding, symmetry) is not None
 
-    solver = Solver()
-    n = len(graph)  # Number of vertices
-    vars = {}
 
-    # Create variables
-    for v in range(n):
-        for c in range(1, k + 1):
-            vars[(v, c)] = v * k + c  # Unique variable for each vertex-color pair
+def optimal_coloring(
+    graph: Graph,
+    search: str = "top-down",
+    encoding: str = "pairwise",
+    symmetry: bool = True,
+) -> dict[int, int]:
+    """
+    Finds a coloring of the graph with as few colors as possible.
 
-    # Condition (i): Every vertex must have at least one color
-    for v in range(n):
-        solver.add_clause([vars[(v, c)] for c in range(1, k + 1)])
+    A greedy clique bounds the chromatic number from below and a DSATUR
+    coloring from above; when they meet the solver is never started.
+    Otherwise the graph is encoded once, with one color fewer than DSATUR
+    used, and only the gap is searched. Top-down search asks for one color
+    fewer than the last coloring found used, so it proves a single bound
+    unsatisfiable. Binary search halves the gap with every query instead.
 
-    # Condition (ii): No vertex can have more than one color
-    for v in range(n):
-        for c1 in range(1, k):
-            for c2 in range(c1 + 1, k + 1):
-                solver.add_clause([-vars[(v, c1)], -vars[(v, c2)]])
+    Args:
+        graph (Graph): A mapping representing the graph, where the keys are the vertices and the values are sequences of adjacent vertices.
+        search (str): How to search the gap, "top-down" or "binary".
+        encoding (str): How at most one color per vertex is encoded, one of ENCODINGS.
+        symmetry (bool): Whether to break color symmetries around the clique.
 
-    # Condition (iii): Adjacent vertices cannot have the same color
-    for v in range(n):
-        for u in graph[v]:
-            if u > v:  # To avoid adding the same clause twice
-                for c in range(1, k + 1):
-                    solver.add_clause([-vars[(v, c)], -vars[(u, c)]])
-
-    # Check for satisfiability
-    if solver.solve():
-        return True
-        # To get the coloring
-        # solution = solver.get_model()
-        # coloring = {}
-        # for v in range(n):
-        #     for c in range(1, k + 1):
-        #         if vars[(v, c)] in solution:
-        #             coloring[v] = c
-        #             break
-        # return coloring
-    else:
-        return False
+    Returns:
+        dict[int, int]: A color for every vertex, using colors 1 to the chromatic number.
+    """
+    if search not in ("top-down", "binary"):
+        raise ValueError(f"Unknown search '{search}', expected top-down or binary.")
+    if not graph:
+        return {}
+    clique = greedy_clique(graph)
+    lower = len(clique)
+    best = dsatur_coloring(graph)
+    upper = max(best.values())
+    if lower < upper:
+        with ColoringSolver(
+            graph, upper - 1, encoding, clique if symmetry else None
+        ) as solver:
+            while lower < upper:
+                k = upper - 1 if search == "top-down" else (lower + upper) // 2
+                if solver.colorable(k):
+                    best = compact_colors(solver.coloring())
+                    upper = max(best.values())
+                else:
+                    lower = k + 1
+    if not is_valid_coloring(graph, best, upper):
+        raise RuntimeError(f"The {upper}-coloring found does not fit the graph.")
+    return best
 
 
-def get_chromatic_number(graph: dict[int, list[int]]) -> int:
+def get_chromatic_number(
+    graph: Graph,
+    search: str = "top-down",
+    encoding: str = "pairwise",
+    symmetry: bool = True,
+) -> int:
     """
     Calculates the chromatic number of a given graph.
 
     Args:
-        graph (dict[int, list[int]]): A dictionary representing the graph, where the keys are the vertices and the values are lists of adjacent vertices.
+        graph (Graph): A mapping representing the graph, where the keys are the vertices and the values are sequences of adjacent vertices.
+        search (str): How to search between the bounds, "top-down" or "binary".
+        encoding (str): How at most one color per vertex is encoded, one of ENCODINGS.
+        symmetry (bool): Whether to break color symmetries around a greedy clique.
 
     Returns:
         int: The chromatic number of the graph.
     """
-    vertex_count = len(graph)
-    for k in range(1, vertex_count + 1):
-        if vertex_k_coloring(graph, k):
-            return k
+    return max(optimal_coloring(graph, search, encoding, symmetry).values(), default=0)
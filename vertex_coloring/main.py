@@ -1,16 +1,31 @@
 import argparse
 
-from color import get_chromatic_number, vertex_k_coloring
+from color import ENCODINGS, find_k_coloring, optimal_coloring
 from reader import read_graph_file
 
 
-def main(graph_path: str, k: int | None):
+def print_coloring(coloring: dict[int, int]):
+    for v in sorted(coloring):
+        print(f"Vertex {v + 1}: color {coloring[v]}")  # 1-based, as in the file
+
+
+def main(
+    graph_path: str,
+    k: int | None,
+    search: str = "top-down",
+    encoding: str = "pairwise",
+    symmetry: bool = True,
+    show_coloring: bool = False,
+):
     graph = read_graph_file(graph_path)
     if k is None:
-        chromatic_number = get_chromatic_number(graph)
+        coloring = optimal_coloring(graph, search, encoding, symmetry)
+        chromatic_number = max(coloring.values(), default=0)
         print(
             f"The chromatic number of the graph is \033[36m{chromatic_number}\033[0m."
         )
+        if show_coloring:
+            print_coloring(coloring)
     else:
         vertex_count = len(graph)
         if k >= vertex_count:
@@ -22,10 +37,13 @@ def main(graph_path: str, k: int | None):
                 "\033[36mBy definition graph cannot be colored using 0 colors.\033[0m"
             )
         else:
-            if vertex_k_coloring(graph, k):
+            coloring = find_k_coloring(graph, k, encoding, symmetry)
+            if coloring is not None:
                 print(
                     f"\033[32mThe graph can be colored using at most {k} colors.\033[0m"
                 )
+                if show_coloring:
+                    print_coloring(coloring)
             else:
                 print(
                     f"\033[31mThe graph cannot be colored using at most {k} colors.\033[0m"
@@ -41,6 +59,38 @@ if __name__ == "__main__":
     parser.add_argument(
         "-k", "--k-color", type=int, help="Number of colors to use for vertex coloring"
     )
+    parser.add_argument(
+        "-s",
+        "--search",
+        choices=["top-down", "binary"],
+        default="top-down",
+        help="How to search between the clique and DSATUR bounds",
+    )
+    parser.add_argument(
+        "-e",
+        "--encoding",
+        choices=ENCODINGS,
+        default="pairwise",
+        help="How to encode that a vertex gets at most one color",
+    )
+    parser.add_argument(
+        "--no-symmetry",
+        action="store_true",
+        help="Do not pin a clique to fixed colors to break color symmetries",
+    )
+    parser.add_argument(
+        "-c",
+        "--coloring",
+        action="store_true",
+        help="Print the color of every vertex",
+    )
     args = parser.parse_args()
 
-    main(args.graph_path, args.k_color)
+    main(
+        args.graph_path,
+        args.k_color,
+        args.search,
+        args.encoding,
+        not args.no_symmetry,
+        args.coloring,
+    )
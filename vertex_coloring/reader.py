@@ -1,7 +1,23 @@
+import bz2
+import gzip
+import itertools
+import mmap
+import operator
+import re
+from array import array
+from collections import deque
+from collections.abc import Mapping
 from pathlib import Path
 from sys import stderr
+from typing import BinaryIO, Iterator
 
 GRAPH_DIR = "graphs"
+EDGE_LINE = re.compile(rb"^e (\d+) (\d+)[ \t\r\f\v]*$", re.MULTILINE)
+EDGE_BLOCK = re.compile(
+    rb"(?:e [0-9]+ [0-9]+[ \t\r\f\v]*\n)*(?:e [0-9]+ [0-9]+[ \t\r\f\v]*)?"
+)
+COMMENT_LINE = re.compile(rb"^c", re.MULTILINE)
+WINDOW_BITS = 12  # The CSR arrays are built for 4096 vertices at a time
 
 
 def GraphException(message: str):
@@ -54,46 +70,226 @@ def e_line(line: str, vertex_count: int) -> tuple[int, int]:
     return a - 1, b - 1  # 0-based indexing
 
 
-def read_graph_file(file_name: str) -> dict[int, list[int]]:
+class CSRGraph(Mapping):
+    """
+    Undirected graph in compressed sparse row form.
+
+    The neighbors of vertex v are `neighbors[offsets[v]:offsets[v + 1]]`, in
+    the order their edges appear in the file. Indexing returns a zero-copy
+    view of that slice, so the graph reads like the dict of neighbor lists
+    the colorings were written against.
+    """
+
+    def __init__(self, offsets: array, neighbors: array):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.view = memoryview(neighbors)
+
+    def __reduce__(self):
+        return CSRGraph, (self.offsets, self.neighbors)  # Views cannot be pickled
+
+    def __getitem__(self, v: int) -> memoryview:
+        if not 0 <= v < len(self.offsets) - 1:
+            raise KeyError(v)
+        return self.view[self.offsets[v] : self.offsets[v + 1]]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.offsets) - 1))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.neighbors) // 2
+
+
+def open_graph_file(file_path: Path, use_mmap: bool) -> BinaryIO:
+    """Opens a plain, gzip or bz2 graph file for bulk binary reads."""
+    with open(file_path, "rb") as file:
+        magic = file.read(3)
+    if magic[:2] == b"\x1f\x8b":
+        return gzip.open(file_path, "rb")
+    if magic == b"BZh":
+        return bz2.open(file_path, "rb")
+    if use_mmap and file_path.stat().st_size:
+        with open(file_path, "rb") as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return open(file_path, "rb")
+
+
+def read_blocks(stream: BinaryIO, block_size: int) -> Iterator[bytes]:
+    """Reads `stream` in blocks of about `block_size` bytes ending on a line break."""
+    rest = b""
+    while block := stream.read(block_size):
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        rest = block[cut:]
+        if cut:
+            yield block[:cut]
+    if rest:
+        yield rest
+
+
+def invalid_indices(line: str, vertex_count: int):
+    e_line(line, vertex_count)  # Reports indices above the vertex count
+    GraphException(
+        f"Invalid vertex indices. The vertex indices in the line '{line}' should be between 1 and {vertex_count}."
+    )
+
+
+def edge_keys(edges: array, vertex_count: int) -> set[int]:
+    """Keys of the edges read so far, reporting the first one that repeats another."""
+    seen: set[int] = set()
+    ends = iter(edges)
+    for a, b in zip(ends, ends):
+        key = a * vertex_count + b if a < b else b * vertex_count + a
+        if key in seen:
+            GraphException(
+                f"Invalid graph description. The edge ({a + 1}, {b + 1}) is duplicated."
+            )
+        seen.add(key)
+    return seen
+
+
+def csr_arrays(edges: array, vertex_count: int) -> tuple[array, array, bool]:
+    """
+    Sorts both ends of every edge into CSR offsets and neighbors.
+
+    A counting sort done one window of 2**WINDOW_BITS vertices at a time: the
+    neighbors are first routed to the window of their vertex, then each window
+    gets a row per vertex, whose lengths are the degrees that make the offsets.
+    Only one window of rows exists at a time. Also tells whether some row has
+    a neighbor twice, that is, whether some edge is duplicated.
+    """
+    windows = (vertex_count >> WINDOW_BITS) + 1
+    empty = array("i")  # Copies of one empty array are faster than calling array()
+    vertices = list(map(array.__copy__, itertools.repeat(empty, windows)))
+    targets = list(map(array.__copy__, itertools.repeat(empty, windows)))
+    others = array("i", edges)
+    others[0::2], others[1::2] = edges[1::2], edges[0::2]
+    for routed, values in ((vertices, edges), (targets, others)):
+        window_of = map(operator.rshift, edges, itertools.repeat(WINDOW_BITS))
+        deque(map(array.append, map(routed.__getitem__, window_of), values), maxlen=0)
+    del others
+
+    offsets = array("q", [0])
+    neighbors = array("i")
+    duplicated = False
+    for window in range(windows):
+        first = window << WINDOW_BITS
+        size = min(1 << WINDOW_BITS, vertex_count - first)
+        rows = list(map(array.__copy__, itertools.repeat(empty, size)))
+        local = map(operator.sub, vertices[window], itertools.repeat(first))
+        appends = map(array.append, map(rows.__getitem__, local), targets[window])
+        deque(appends, maxlen=0)
+        vertices[window] = targets[window] = empty  # Free the routed neighbors
+        degrees = list(map(len, rows))
+        if not duplicated:
+            duplicated = sum(map(len, map(set, rows))) < sum(degrees)
+        offsets.extend(map(offsets[-1].__add__, itertools.accumulate(degrees)))
+        neighbors.extend(itertools.chain.from_iterable(rows))
+    return offsets, neighbors, duplicated
+
+
+def read_graph_file(
+    file_name: str, use_mmap: bool = False, block_size: int = 1 << 20
+) -> CSRGraph:
+    """
+    Reads a DIMACS graph file, plain or compressed with gzip or bz2, as a CSRGraph.
+
+    The file is read in blocks. A block of well-formed edge lines is checked
+    with one regular expression and split into its numbers, one that also has
+    comments has its edges picked out by another. Their edges are checked in
+    bulk and kept in one flat array. Any other block is checked line by line,
+    so errors are reported as before, for the first offending line. Duplicate
+    edges are found while the CSR arrays are built, and only then looked for
+    line by line.
+    """
     file_path = Path(GRAPH_DIR) / file_name
 
-    with open(file_path, "r", encoding="utf-8") as file:
-        first_line = next(line for line in file if not line.startswith("c "))
+    with open_graph_file(file_path, use_mmap) as stream:
+        blocks = read_blocks(stream, block_size)
+        first_line = None
+        for block in blocks:
+            start = 0
+            while start < len(block):
+                end = block.find(b"\n", start) + 1 or len(block)
+                if not block.startswith(b"c ", start):
+                    first_line = block[start:end].decode("utf-8")
+                    remaining = block[end:]
+                    break
+                start = end
+            if first_line is not None:
+                break
+        if first_line is None:
+            GraphException("Invalid file format. The file has no 'p' line.")
         if not first_line.startswith("p"):
             GraphException(
                 "Invalid file format. The first (non-comment) line should start with 'p'."
             )
 
         vertex_count, edge_count = p_line(first_line)
-        graph = {i: [] for i in range(vertex_count)}
-        count = 0
-        for line in file:
-            if line.startswith("c"):
+        n = vertex_count
+        edges = array("i")  # Both 0-based ends of every edge, in file order
+        for block in itertools.chain([remaining], blocks):
+            if not block:
                 continue
-            if line.startswith("p"):
-                GraphException(
-                    "Invalid file format. There should be only one 'p' line."
-                )
-            if not line.startswith("e"):
-                GraphException(
-                    "Invalid file format. The (non-comment) lines after the 'p' line should start with 'e'."
-                )
-            a, b = e_line(line, vertex_count)
-            if a == b:
-                GraphException(
-                    f"Invalid graph description. The edge ({a + 1}, {b + 1}) is a self-loop."
-                )
-            if b in graph[a]:
-                GraphException(
-                    f"Invalid graph description. The edge ({a + 1}, {b + 1}) is duplicated."
-                )
-            graph[a].append(b)
-            graph[b].append(a)  # undirected graph
-            count += 1
-
-        if count != edge_count:
-            GraphException(
-                f"Invalid graph description. The number of edges ({edge_count}) does not match the number of lines in the file ({count - 1})."
-            )
+            ends = None  # Both 0-based ends of every edge, if all lines are edges
+            if EDGE_BLOCK.fullmatch(block):  # Only edge lines, the usual case
+                tokens = block.split()
+                del tokens[0::3]  # The "e" of every line
+                ends = list(map((-1).__add__, map(int, tokens)))
+            else:
+                matches = EDGE_LINE.findall(block)
+                line_count = block.count(b"\n") + (not block.endswith(b"\n"))
+                if len(matches) + len(COMMENT_LINE.findall(block)) == line_count:
+                    ends = list(map((-1).__add__, map(int, itertools.chain(*matches))))
+            if (
+                ends is not None
+                and (not ends or (min(ends) >= 0 and max(ends) < n))
+                and not any(map(operator.eq, ends[0::2], ends[1::2]))
+            ):
+                edges.extend(ends)
+                continue
+
+            # Some line is invalid. Go through the block the way it always was,
+            # with every check for every line, to report the first error
+            seen = edge_keys(edges, n)
+            for line in block.decode("utf-8").splitlines():
+                if line.startswith("c"):
+                    continue
+                if line.startswith("p"):
+                    GraphException(
+                        "Invalid file format. There should be only one 'p' line."
+                    )
+                if not line.startswith("e"):
+                    GraphException(
+                        "Invalid file format. The (non-comment) lines after the 'p' line should start with 'e'."
+                    )
+                a, b = e_line(line, vertex_count)
+                if a < 0 or b < 0:
+                    invalid_indices(line.strip(), vertex_count)
+                if a == b:
+                    GraphException(
+                        f"Invalid graph description. The edge ({a + 1}, {b + 1}) is a self-loop."
+                    )
+                key = a * n + b if a < b else b * n + a
+                if key in seen:
+                    GraphException(
+                        f"Invalid graph description. The edge ({a + 1}, {b + 1}) is duplicated."
+                    )
+                seen.add(key)
+                edges.append(a)
+                edges.append(b)
+
+    offsets, neighbors, duplicated = csr_arrays(edges, vertex_count)
+    if duplicated:
+        edge_keys(edges, vertex_count)  # Reports the first duplicated edge
+    count = len(edges) // 2
+    if count != edge_count:
+        GraphException(
+            f"Invalid graph description. The number of edges ({edge_count}) does not match the number of lines in the file ({count})."
+        )
 
-        return graph
+    return CSRGraph(offsets, neighbors)
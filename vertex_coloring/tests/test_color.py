@@ -1,7 +1,23 @@
+import bz2
+import gzip
+import io
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
-from color import get_chromatic_number, vertex_k_coloring
-from reader import read_graph_file
+from color import (
+    ENCODINGS,
+    ColoringSolver,
+    dsatur_coloring,
+    find_k_coloring,
+    get_chromatic_number,
+    greedy_clique,
+    is_valid_coloring,
+    optimal_coloring,
+    vertex_k_coloring,
+)
+from reader import GRAPH_DIR, read_graph_file
 
 
 class TestGraphColoring(unittest.TestCase):
@@ -13,3 +29,158 @@ class TestGraphColoring(unittest.TestCase):
         graph = read_graph_file("graph1.txt")
         self.assertTrue(vertex_k_coloring(graph, 3))
         self.assertFalse(vertex_k_coloring(graph, 2))
+
+    def test_coloring_solver_reuses_encoding(self):
+        graph = read_graph_file("graph6.txt")
+        with ColoringSolver(graph, 5) as solver:
+            self.assertTrue(solver.colorable(5))
+            self.assertFalse(solver.colorable(3))
+            self.assertTrue(solver.colorable(4))
+            self.assertEqual(solver.colors_used(), 4)
+            self.assertFalse(solver.colorable(2))
+
+    def test_bounds(self):
+        graph = read_graph_file("graph0.txt")
+        coloring = dsatur_coloring(graph)
+        for v in graph:
+            for u in graph[v]:
+                self.assertNotEqual(coloring[v], coloring[u])
+        clique = greedy_clique(graph)
+        for v in clique:
+            self.assertTrue(all(u in graph[v] for u in clique if u != v))
+        self.assertLessEqual(len(clique), 3)
+        self.assertLessEqual(3, max(coloring.values()))
+
+    def test_binary_search(self):
+        for name in ["graph0.txt", "graph2.txt", "graph6.txt"]:
+            graph = read_graph_file(name)
+            self.assertEqual(
+                get_chromatic_number(graph, "binary"), get_chromatic_number(graph)
+            )
+
+    def test_encodings(self):
+        graph = read_graph_file("graph7.txt")
+        for encoding in ENCODINGS:
+            for symmetry in (False, True):
+                self.assertTrue(vertex_k_coloring(graph, 5, encoding, symmetry))
+                self.assertFalse(vertex_k_coloring(graph, 4, encoding, symmetry))
+                self.assertEqual(
+                    get_chromatic_number(graph, "top-down", encoding, symmetry), 5
+                )
+
+    def test_find_k_coloring(self):
+        graph = read_graph_file("graph7.txt")
+        coloring = find_k_coloring(graph, 5)
+        self.assertTrue(is_valid_coloring(graph, coloring, 5))
+        self.assertIsNone(find_k_coloring(graph, 4))
+        coloring = optimal_coloring(graph, "binary")
+        self.assertEqual(max(coloring.values()), 5)
+        self.assertTrue(is_valid_coloring(graph, coloring, 5))
+
+    def test_is_valid_coloring(self):
+        graph = read_graph_file("graph1.txt")
+        self.assertTrue(is_valid_coloring(graph, {0: 1, 1: 2, 2: 3}, 3))
+        self.assertFalse(is_valid_coloring(graph, {0: 1, 1: 2, 2: 1}, 3))
+        self.assertFalse(is_valid_coloring(graph, {0: 1, 1: 2, 2: 4}, 3))
+        self.assertFalse(is_valid_coloring(graph, {0: 1, 1: 2}, 3))
+
+
+class TestReadGraphFile(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.text = (Path(GRAPH_DIR) / "graph7.txt").read_bytes()
+        self.expected = adjacency(read_graph_file("graph7.txt"))
+
+    def write(self, name: str, data: bytes) -> str:
+        path = self.directory / name
+        path.write_bytes(data)
+        return str(path)
+
+    def assert_invalid(self, text: str, message: str):
+        path = self.write("invalid.txt", text.encode())
+        for block_size in (8, 1 << 20):  # Errors split across blocks, or not
+            with self.subTest(text=text, block_size=block_size):
+                with patch("reader.stderr", new_callable=io.StringIO) as stderr:
+                    with self.assertRaises(SystemExit) as exit:
+                        read_graph_file(path, block_size=block_size)
+                self.assertEqual(exit.exception.code, 1)
+                self.assertIn(message, stderr.getvalue())
+
+    def test_csr_structure(self):
+        graph = read_graph_file("graph7.txt")
+        self.assertEqual(len(graph), 120)
+        self.assertEqual(graph.edge_count, 718)
+        self.assertEqual(list(graph), list(range(120)))
+        self.assertEqual(graph.offsets[-1], 2 * 718)
+        self.assertTrue(all(v in graph[u] for v in graph for u in graph[v]))
+        self.assertNotIn(120, graph)
+        with self.assertRaises(KeyError):
+            graph[-1]
+
+    def test_compressed_and_mapped_files(self):
+        paths = {
+            "gzip": self.write("graph7.txt.gz", gzip.compress(self.text)),
+            "bz2": self.write("graph7.txt.bz2", bz2.compress(self.text)),
+        }
+        for name, path in paths.items():
+            for block_size in (64, 1 << 20):
+                with self.subTest(name=name, block_size=block_size):
+                    graph = read_graph_file(path, block_size=block_size)
+                    self.assertEqual(adjacency(graph), self.expected)
+        graph = read_graph_file("graph7.txt", use_mmap=True, block_size=64)
+        self.assertEqual(adjacency(graph), self.expected)
+
+    def test_comments_and_line_breaks(self):
+        # Comments between edges leave the blocks to the edge-picking regex
+        lines = self.text.split(b"\n")
+        commented = b"\n".join(
+            line + b"\nc comment" if line.startswith(b"e") else line for line in lines
+        )
+        for text in (commented, self.text.replace(b"\n", b"\r\n")):
+            path = self.write("graph.txt", text)
+            for block_size in (64, 1 << 20):
+                with self.subTest(text=text[:20], block_size=block_size):
+                    graph = read_graph_file(path, block_size=block_size)
+                    self.assertEqual(adjacency(graph), self.expected)
+
+    def test_invalid_header(self):
+        self.assert_invalid("", "The file has no 'p' line.")
+        self.assert_invalid("c only\nc comments\n", "The file has no 'p' line.")
+        self.assert_invalid("e 1 2\n", "should start with 'p'")
+        self.assert_invalid("p edge three 1\ne 1 2\n", "formatted as 'p edge a b'")
+        self.assert_invalid("p edge 3 4\n", "cannot be greater than the number")
+
+    def test_invalid_edges(self):
+        header = "c triangle\np edge 3 3\n"
+        self.assert_invalid(header + "e 1 2\ne 2 4\ne 1 3\n", "between 0 and 4")
+        self.assert_invalid(header + "e 1 2\ne 0 3\ne 1 3\n", "between 1 and 3")
+        self.assert_invalid(header + "e 1 2\ne 2 2\ne 1 3\n", "(2, 2) is a self-loop")
+        self.assert_invalid(header + "e 1 2\ne 2 1\ne 1 3\n", "(2, 1) is duplicated")
+        self.assert_invalid(header + "e 1 2\ne 2 3\n", "lines in the file (2)")
+        self.assert_invalid(header + "e 1 2\ne 2  3\ne 1 3\n", "formatted as 'e a b'")
+        self.assert_invalid(header + "e 1 2\n\ne 1 3\n", "should start with 'e'")
+        self.assert_invalid(header + "e 1 2\np edge 3 3\n", "only one 'p' line")
+
+    def test_first_error_is_reported(self):
+        # A line-by-line check of the block finds the self-loop before the range
+        self.assert_invalid(
+            "p edge 3 3\ne 1 2\ne 3 3\ne 1 9\n", "(3, 3) is a self-loop"
+        )
+        self.assert_invalid("p edge 3 3\ne 1 2\ne 1 9\ne 3 3\n", "between 0 and 4")
+        # Also when the block has lines that are not edges
+        self.assert_invalid("p edge 3 2\ne 1 1\nfoo\n", "(1, 1) is a self-loop")
+        self.assert_invalid("p edge 3 2\ne 1 0\np edge 3 2\n", "between 1 and 3")
+        self.assert_invalid("p edge 3 3\ne 1 2\ne 2 1\nfoo\n", "(2, 1) is duplicated")
+        self.assert_invalid("p edge 3 2\nfoo\ne 1 1\n", "should start with 'e'")
+        # And when an edge is repeated many lines before an invalid one
+        edges = "".join(f"e 1 {v}\n" for v in range(2, 50))
+        self.assert_invalid(
+            f"p edge 50 60\ne 3 1\n{edges}e 50 50\n", "(1, 3) is duplicated"
+        )
+        self.assert_invalid(f"p edge 50 60\ne 3 1\n{edges}", "(1, 3) is duplicated")
+
+
+def adjacency(graph) -> dict[int, list[int]]:
+    return {v: list(graph[v]) for v in graph}